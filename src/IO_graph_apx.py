@@ -8,8 +8,8 @@ Creation Date: 19/03/2024
 """
 
 import os, sys, argparse, re
-import glob
-import networkx
+import glob, gc, gzip, hashlib, json, mmap, tempfile
+import numpy as np
 
 def get_command_args() -> str:
     """ 
@@ -35,56 +35,178 @@ def get_command_args() -> str:
 
     return file_name
 
-def read_graph_from_apx(file_path: str) -> dict:
+# Statements of an .apx file, at the beginning of a line: arg(a). and att(a,b).
+APX_ARGUMENT = re.compile(r'^arg\(([^)\n]*)\)', re.MULTILINE)
+APX_ATTACK = re.compile(r'^att\(([^,)\n]*),([^,)\n]*)\)', re.MULTILINE)
+
+def scan_apx(file_path: str) -> tuple:
     """
-    Returns the Graph read from the specified file as a dictionary.
+    Scans the statements of an .apx file, with one regular expression pass over its memory-mapped content
+    per kind of statement.
 
     Args:
-        file_name (str): The name of the file containing the Universe Graph.
+        file_path (str): The path of the .apx file.
 
     Returns:
-        dict: The Graph represented as a dictionary.
-        Key : attacked argument, Value : list of attacking arguments (may be empty).
+        tuple: (labels, attacks) where labels is the list of arguments and attacks the list of
+        (attacker, attacked) pairs, both in the order of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
     """
 
     if not os.path.exists(file_path):
-        print(f"The file {file_path} does not exist.")
-        sys.exit(1)
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
 
-    graph = {}
+    if os.path.getsize(file_path) == 0:
+        return [], []
 
-    with open(file_path, 'r') as file:
-        for line in file:
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        text = content[:].decode()
 
-            # Get the line content
-            content = line[line.find("(")+1 : line.find(")")]
+    return list(dict.fromkeys(APX_ARGUMENT.findall(text))), APX_ATTACK.findall(text)
 
-            # Add arguments to the dict as attacked args.
-            if line.startswith("arg"):
-                argument = content
-                graph[argument] = list()
+def parse_apx(file_path: str) -> tuple:
+    """
+    Parses an .apx file into integer-indexed arrays.
 
-            # For each attacker, add it to the list of attacking args.
-            elif line.startswith("att"):
-                attacker, attacked = content.split(',')[0], content.split(',')[1]                
-                graph[attacked].append(attacker)
-                
-    return graph
+    Args:
+        file_path (str): The path of the .apx file.
 
-def export_DiGraph_as_apx(file_name: str, graph: 'networkx.classes.digraph.DiGraph') -> None:
+    Returns:
+        tuple: (labels, indptr, indices), the graph in compressed sparse row form: labels is the list of
+        arguments in the order of the file, and the attackers of labels[i] are the labels of
+        indices[indptr[i]:indptr[i+1]] (numpy int32 arrays), in the order of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If an attack involves an argument which is not declared in the file.
     """
-    Writes the graph represented as a directed graph (DiGraph) to a file in the specified folder with the given file name.
+
+    labels, attacks = scan_apx(file_path)
+
+    index = {k: i for i, k in enumerate(labels)}
+    try:
+        attackers = np.array([index[a] for a, _ in attacks], dtype=np.int32)
+        attacked = np.array([index[b] for _, b in attacks], dtype=np.int32)
+    except KeyError as error:
+        raise ValueError(f"An attack of {file_path} involves the undeclared argument {error}.") from None
+
+    # Group the attacks by attacked argument, keeping the order of the file.
+    order = np.argsort(attacked, kind='stable')
+    indptr = np.zeros(len(labels) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(attacked, minlength=len(labels)), out=indptr[1:])
+
+    return labels, indptr, attackers[order]
+
+def apx_cache_path(file_path: str) -> str:
+    """
+    Returns the path of the binary cache of an .apx file, written next to it.
+    """
+
+    return file_path + ".cache.npz"
+
+def read_apx_arrays(file_path: str, cache=True) -> tuple:
+    """
+    Returns the arrays of an .apx file (see parse_apx), from its binary cache when it is up to date.
+
+    The cache stores the labels and the integer arrays together with the size and modification time
+    of the .apx file, and is rewritten whenever they no longer match. A cache that cannot be read (missing,
+    truncated, corrupted) is rebuilt, and one that cannot be written is ignored. The cache is written to a
+    temporary file moved into place afterwards, so that a concurrent or interrupted run never sees it half written.
 
     Args:
-        folder_name (str): The name of the folder where the file will be saved.
-        file_name (str): The name of the file to write the graph to.
-        graph (networkx.classes.digraph.DiGraph): The graph represented as a directed graph (DiGraph).
+        file_path (str): The path of the .apx file.
+        cache (bool): Whether to use and maintain the binary cache (default is True).
 
     Returns:
-        None.
+        tuple: (labels, indptr, indices).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If an attack involves an argument which is not declared in the file.
+    """
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+
+    if not cache:
+        return parse_apx(file_path)
+
+    status = os.stat(file_path)
+    cache_path = apx_cache_path(file_path)
+
+    try:
+        with np.load(cache_path) as stored:
+            if int(stored["size"]) == status.st_size and int(stored["mtime_ns"]) == status.st_mtime_ns:
+                return stored["labels"].tolist(), stored["indptr"], stored["indices"]
+    except Exception:
+        # Whatever the reason (zipfile.BadZipFile, EOFError, OSError, ...), the cache is rebuilt.
+        pass
+
+    labels, indptr, indices = parse_apx(file_path)
+
+    temporary_path = None
+    try:
+        descriptor, temporary_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(os.path.abspath(cache_path)))
+        with os.fdopen(descriptor, 'wb') as file:
+            np.savez(file, labels=np.array(labels, dtype=str), indptr=indptr, indices=indices,
+                     size=status.st_size, mtime_ns=status.st_mtime_ns)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        if temporary_path is not None and os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    return labels, indptr, indices
+
+def read_graph_from_apx(file_path: str, cache=False) -> dict:
+    """
+    Returns the Graph read from the specified file as a dictionary.
+
+    Args:
+        file_path (str): The path of the file containing the graph.
+        cache (bool): Whether to use and maintain a binary cache next to the file, which makes the following
+        reads of the same file much faster (default is False).
+
+    Returns:
+        dict: The Graph represented as a dictionary.
+        Key : attacked argument, Value : list of attacking arguments (may be empty).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If an attack involves an argument which is not declared in the file.
+    """
+
+    # The graph is made of many small objects: the garbage collector is paused while they are created.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        if cache:
+            labels, indptr, indices = read_apx_arrays(file_path)
+            names = [labels[j] for j in indices.tolist()]
+            bounds = indptr.tolist()
+            return {k: names[bounds[i]:bounds[i+1]] for i, k in enumerate(labels)}
+
+        labels, attacks = scan_apx(file_path)
+        graph = {k: [] for k in labels}
+
+        for attacker, attacked in attacks:
+            if attacker not in graph or attacked not in graph:
+                undeclared = attacker if attacker not in graph else attacked
+                raise ValueError(f"An attack of {file_path} involves the undeclared argument '{undeclared}'.")
+            graph[attacked].append(attacker)
+
+        return graph
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def create_debate_folder() -> str:
+    """
+    Creates the next debate_N subfolder of the results folder, and returns its name.
     """
 
-    extension = ".apx"
     folder = "results/"
     if not os.path.exists(folder):
         os.mkdir(folder)
@@ -102,6 +224,25 @@ def export_DiGraph_as_apx(file_name: str, graph: 'networkx.classes.digraph.DiGra
         new_val = last_subfolder + 1
         os.mkdir(folder+f"/debate_{new_val}")
         debate_name = f"debate_{new_val}"
+
+    return debate_name
+
+def export_DiGraph_as_apx(file_name: str, graph: 'networkx.classes.digraph.DiGraph') -> None:
+    """
+    Writes the graph represented as a directed graph (DiGraph) to a file in the specified folder with the given file name.
+
+    Args:
+        folder_name (str): The name of the folder where the file will be saved.
+        file_name (str): The name of the file to write the graph to.
+        graph (networkx.classes.digraph.DiGraph): The graph represented as a directed graph (DiGraph).
+
+    Returns:
+        None.
+    """
+
+    extension = ".apx"
+    folder = "results/"
+    debate_name = create_debate_folder()
     
     debate_path = folder + debate_name + "/" + file_name + extension
     
@@ -153,5 +294,154 @@ def export_apx(folder_path_name: str, file_name: str, graph: dict) -> None:
                 for argAtt in value:
                     # Fill with attack relations.
                     file.write("att(" + str(argAtt) + "," + str(key) + ").\n")
-                    
-    
\ No newline at end of file
+
+def export_attacks_as_apx(file_path: str, nb_arguments: int, attackers, attacked, chunk_size=10**6) -> None:
+    """
+    Writes a graph given as arrays of attacks to an .apx file, chunk by chunk, without building it in memory.
+    The arguments are the integers 0 to nb_arguments-1, and the attacks are written in the order of the arrays.
+
+    Args:
+        file_path (str): The path of the .apx file.
+        nb_arguments (int): The number of arguments.
+        attackers (array): The attacking argument of each attack.
+        attacked (array): The attacked argument of each attack.
+        chunk_size (int): The number of lines formatted at once (default is 1e6).
+
+    Returns:
+        None.
+    """
+
+    if os.path.exists(file_path):
+        raise FileExistsError(f"You cannot write (export) into the file {file_path} because it already exists and contains a graph.")
+
+    with open(file_path, 'w') as file:
+        for start in range(0, nb_arguments, chunk_size):
+            file.write("".join(f"arg({i}).\n" for i in range(start, min(start + chunk_size, nb_arguments))))
+
+        for start in range(0, len(attackers), chunk_size):
+            chunk = zip(attackers[start:start + chunk_size].tolist(), attacked[start:start + chunk_size].tolist())
+            file.write("".join(f"att({a},{b}).\n" for a, b in chunk))
+
+# Packs the public graphs of every agent order of a debate into a single archive file.
+class PublicGraphArchive :
+
+    def __init__(self, path: str):
+        """
+        Prepares an archive of public graphs, written to path (gzip-compressed JSON) when it is closed.
+
+        A public graph is always the subgraph of UG induced by its arguments, so only the list of its arguments
+        is stored, in the order they were added to the debate, so that its .apx file can be rebuilt exactly.
+        Each distinct list is stored once (identified by a hash of the list), together with an index from each
+        agent order to the hash of its list. This replaces the one .apx file per order written by export_apx.
+        When used in a with statement, the archive is written even if the run is interrupted.
+
+        Args:
+            path (str): The path of the archive file.
+        """
+
+        self.path = path
+        self.graphs = {}
+        self.orders = {}
+        self.closed = False
+
+    @staticmethod
+    def graph_hash(arguments) -> str:
+        """
+        Returns the hash identifying a list of arguments, in the order they are listed.
+        """
+
+        return hashlib.sha1("\n".join(arguments).encode()).hexdigest()
+
+    def add(self, order: str, graph: dict) -> None:
+        """
+        Adds the public graph reached by an agent order.
+
+        Args:
+            order (str): The agent order.
+            graph (dict): The public graph.
+        """
+
+        key = self.graph_hash(graph.keys())
+        if key not in self.graphs:
+            self.graphs[key] = list(graph.keys())
+        self.orders[order] = key
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        with gzip.open(self.path, 'wt') as file:
+            json.dump({"graphs": self.graphs, "orders": self.orders}, file)
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def read_public_graph_archive(path: str) -> tuple:
+    """
+    Reads an archive written by PublicGraphArchive.
+
+    Args:
+        path (str): The path of the archive file.
+
+    Returns:
+        tuple: (graphs, orders) where graphs maps each hash to its list of arguments, in the order they were
+        added, and orders maps each agent order to the hash of the arguments of its public graph.
+    """
+
+    with gzip.open(path, 'rt') as file:
+        content = json.load(file)
+
+    return content["graphs"], content["orders"]
+
+def archived_public_graph(graphs: dict, orders: dict, UG: dict, order: str) -> dict:
+    """
+    Returns the public graph reached by an agent order, from the content of an archive (see read_public_graph_archive).
+    """
+
+    arguments = graphs[orders[order]]
+    members = set(arguments)
+
+    return {arg: sorted(a for a in UG[arg] if a in members) for arg in arguments}
+
+def public_graph_from_archive(path: str, UG: dict, order: str) -> dict:
+    """
+    Returns the public graph reached by an agent order, rebuilt from an archive and the universe graph.
+
+    Args:
+        path (str): The path of the archive file.
+        UG (dict): The universe graph of the debate.
+        order (str): The agent order.
+
+    Returns:
+        dict: The public graph, with its arguments in the order they were added and the attacks of UG between
+        them (sorted attackers), as returned by the debate.
+    """
+
+    return archived_public_graph(*read_public_graph_archive(path), UG, order)
+
+def export_apx_from_archive(path: str, UG: dict, folder_path_name: str, orders=None) -> None:
+    """
+    Writes the .apx file of the public graph of the given orders (all of them by default) from an archive,
+    as export_apx would have done during the debate.
+
+    Args:
+        path (str): The path of the archive file.
+        UG (dict): The universe graph of the debate.
+        folder_path_name (str): The folder where the files are written.
+        orders (list): The agent orders to export (default is None, every order of the archive).
+
+    Returns:
+        None.
+    """
+
+    graphs, index = read_public_graph_archive(path)
+    if orders is None:
+        orders = index.keys()
+
+    for order in orders:
+        export_apx(folder_path_name, order, archived_public_graph(graphs, index, UG, order))
@@ -9,10 +9,15 @@ Creation Date: 20/03/2024
 
 from src.util import *
 
+# Candidate moves are pruned with bounds on their impact (see DebateState.impact_ranges) when there are at least
+# this many of them, None disabling the pruning. On the shallow public graphs of the default debates, the bounds
+# cost about as much as the evaluations they save, so it is disabled by default. It pays off on deep trees, with 5.
+pruning_min_moves = None
+
 # Represents the agent class.
 class agent :
    
-    def __init__(self, i, OG, UG, cl=0.05):
+    def __init__(self, i, OG, UG, cl=0.05, Vk=None, reverse_index=None, semantics="hbs", nbAtt=None, cone=False):
         """
         Initializes the agent with its properties.
 
@@ -21,16 +26,25 @@ class agent :
             OG (dict): The opinion graph representing the agent's knowledge.
             UG (dict): The universe graph representing the entire argumentation framework.
             cl (float): The comfort level of the agent (default is 0.05).
+            Vk (float): The value of the issue in OG when already known, e.g. computed in batch (default is None).
+            reverse_index (dict): The reverse adjacency list of UG shared by the agents of the debate (default is None).
+            semantics (str): The gradual semantics giving the value of the agent's opinion (default is "hbs",
+            see util.SEMANTICS). It should be the semantics of the debates the agent takes part in.
+            nbAtt (int): The number of attacks of OG when already known (default is None).
+            cone (bool): Whether Vk is computed on the cone of the issue only, when not given (default is False,
+            see util.opinion_value).
         """
        
         self.name=f"agent_{i}"
         self.OG = OG
-        self.Vk = Hbs(OG, "0") # Value of the agent’s opinion (value of the issue in the agent’s sub-graph).
+        self.semantics = semantics
+        self.Vk = opinion_value(OG, semantics, cone) if Vk is None else Vk # Value of the agent’s opinion (value of the issue in the agent’s sub-graph).
         self.cl = cl
         self.nbArg = len(self.OG.values())
-        self.nbAtt = self.get_nb_att()
-        self.attackers_adjacency_list = build_attackers_adjacency_list(OG, UG) # List of attackers.
+        self.nbAtt = self.get_nb_att() if nbAtt is None else nbAtt
+        self.attackers_adjacency_list = build_attackers_adjacency_list(OG, UG, reverse_index) # List of attackers.
         self.historical = dict()
+        self.move_stats = {"evaluated": 0, "pruned": 0} # Candidate moves evaluated / pruned in best_next_move.
         
     def get_Vk(self) -> float:
         """
@@ -51,17 +65,15 @@ class agent :
     def get_number(self):
         return int(self.name.split("_")[1])
     
-    def get_distance(self,PG):
+    def get_distance(self, Vp):
         
-        value=Hbs(self.OG,"0")
-        return value - Hbs(PG,"0")
+        return self.Vk - Vp
     
-    def in_comfort_zone(self, PG) -> bool:
+    def in_comfort_zone(self, Vp) -> bool:
         """ Checks if the agent is in its comfort zone.
 
         Args:
-            PG (dict): The public graph representing the current state of the debate.
-            UG (dict): The universe graph representing the entire argumentation framework.
+            Vp (float): The actual value of the issue of the public debate graph.
 
         Returns:
             bool: True if the agent is in its comfort zone, False otherwise.
@@ -70,9 +82,6 @@ class agent :
         # Boundaries around ideal value Vk.
         low_borne = self.Vk - self.cl
         high_borne = self.Vk + self.cl
-
-        # Vp the actual value of the issue of the public debate graph.
-        Vp = Hbs(PG, "0")
        
         if(Vp >= low_borne and Vp <= high_borne):
             return True
@@ -80,7 +89,7 @@ class agent :
         return False
     
     def get_possible_next_moves(self, PG, UG) -> list:
-    
+
         possible_moves = []
         arg_set = set()
         
@@ -98,65 +107,79 @@ class agent :
         
         return sorted(possible_moves)
     
-    def best_next_move(self, PG, UG, turn) -> dict:
+    def best_next_move(self, state, turn):
         """
-        Determines the best move for the agent to make towards its comfort zone.
+        Determines the best move for the agent to make towards its comfort zone, and plays it.
 
         Args:
-            PG (dict): The public graph representing the current state of the debate.
-            UG (dict): The universe graph representing the entire argumentation framework.
+            state (DebateState): The current state of the debate (public graph and its values).
+            turn (int): The current turn of the debate.
 
         Returns:
-            dict: The updated public graph after making the best move.
+            str: The argument added to the public graph, or None if the agent plays nothing.
         """
 
-        Vp = Hbs(PG, "0")
+        Vp = state.value("0")
                 
         # Already in comfort zone, plays nothing.
-        if(self.in_comfort_zone(PG)):
+        if(self.in_comfort_zone(Vp)):
             
             self.historical[turn] = None
-            return PG
+            return None
         
         # Else, find the best argument to play. 
 
-        possible_moves = self.get_possible_next_moves(PG,UG)
+        possible_moves = state.possible_moves(self.OG)
 
         # If there is no argument to play.
         if(len(possible_moves) == 0):
             
             self.historical[turn] = None
-            return PG
+            return None
         
         # Else, find the best argument to play.
+        # Each candidate gets a lower bound on the gap it can reach, from the range of its impact on the issue.
+        # They are evaluated from the most to the least promising, and the search stops as soon as the remaining
+        # ones cannot reach the best gap. Ties are broken on the sorted order of the moves, so the chosen move
+        # is the same as when evaluating every candidate. Without pruning, they are all evaluated in order.
         arg_to_play = None
-        gap_to_minimize = abs(Vp - self.get_Vk())
-        for move in possible_moves :
-            arguments = [keys for keys in PG]
-            # Generate temporal PG to test its new value adding a new move.
-            arguments.append(move)
-            temp_PG = generate_subgraph(UG, arguments)
-            temp_Vp = Hbs(temp_PG, "0")
-            temp_gap = abs(temp_Vp - self.get_Vk())
+        best_position = None
+        Vk = self.get_Vk()
+        gap_to_minimize = abs(Vp - Vk)
+
+        lowest_gaps = [0] * len(possible_moves)
+        if pruning_min_moves is not None and len(possible_moves) >= pruning_min_moves:
+            ranges = state.impact_ranges(possible_moves)
+            for i, move in enumerate(possible_moves):
+                low, high = ranges[move]
+                lowest_gaps[i] = max(0, Vp + low - Vk, Vk - Vp - high)
+        candidates = sorted(range(len(possible_moves)), key=lowest_gaps.__getitem__)
+
+        for n, i in enumerate(candidates):
+            move = possible_moves[i]
+            if lowest_gaps[i] > gap_to_minimize or (arg_to_play == None and lowest_gaps[i] >= gap_to_minimize):
+                self.move_stats["pruned"] += len(candidates) - n
+                break
+
+            self.move_stats["evaluated"] += 1
+            temp_Vp = state.what_if(move)
+            temp_gap = abs(temp_Vp - Vk)
 
             # Updating the best value
-            if(temp_gap < gap_to_minimize):
+            if(temp_gap < gap_to_minimize or (temp_gap == gap_to_minimize and arg_to_play != None and i < best_position)):
                 arg_to_play = move
+                best_position = i
                 gap_to_minimize = temp_gap
         
         # If no argument brings him closer to his comfort zone.
         if(arg_to_play == None):
             self.historical[turn] = None
-            return PG
+            return None
         
-        # Else, plays one of the goods arguments.
-        arguments = [keys for keys in PG]
-        arguments.append(arg_to_play)
+        # Else, plays one of the goods arguments (the values of PG are updated incrementally).
         self.historical[turn] = arg_to_play
+        state.add_argument(arg_to_play)
         
-        new_PG = generate_subgraph(UG, arguments)
-        
-        # Generate new PG
-        return new_PG
+        return arg_to_play
     
     
@@ -0,0 +1,369 @@
+# src/debate_state.py
+
+"""
+This Python script contains a class representing the state of a public debate, whose argument values
+are maintained incrementally as arguments are added.
+
+Authors: Mohamed AZZAOUI, Nassim LATTAB
+Creation Date: 18/10/2026
+"""
+
+from bisect import insort
+from src.util import *
+
+# Represents the public graph (PG) of a debate together with the value of its arguments.
+class DebateState :
+
+    def __init__(self, UG, PG=None, reverse_index=None, cache=None, warm_start=False, semantics="hbs", method="jacobi"):
+        """
+        Initializes the debate state.
+
+        Args:
+            UG (dict): The universe graph representing the entire argumentation framework.
+            PG (dict): The initial public graph (default is the issue alone, {"0":[]}).
+            reverse_index (dict): The reverse adjacency list of UG, shared between debates on the same UG
+            (default is None, built from UG).
+            cache (HbsCache): A cache of the values of subgraphs of UG, used whenever a public graph has to be
+            evaluated from scratch (default is None, no cache).
+            warm_start (bool): Whether cyclic public graphs are solved starting from the current values rather than
+            from 1 (default is False). It saves sweeps, but the values then depend, within the convergence
+            threshold, on the path that led to the public graph.
+            semantics (str): The gradual semantics giving the values of the arguments (default is "hbs",
+            see util.SEMANTICS).
+            method (str): The fixed-point method of util.Hbs_solve for cyclic public graphs (default is "jacobi",
+            the values of Hbs). "gauss-seidel" needs fewer sweeps, but moves the values within the convergence
+            threshold, and thus possibly the moves of the agents.
+        """
+
+        self.UG = UG
+        self.cache = cache
+        self.warm_start = warm_start
+        self.method = method
+        self.semantics = semantics
+        self.kernel = semantics_kernel(semantics)
+        self.solver_stats = {} # Sweeps of the fixed-point solver on cyclic public graphs (see util.Hbs_solve).
+        self.reverse_index = build_reverse_adjacency_list(UG) if reverse_index is None else reverse_index
+
+        # Public graph. Key : attacked argument, Value : sorted list of its attackers in PG.
+        self.PG = {"0": []} if PG is None else {k: list(v) for k, v in PG.items()}
+
+        # Arguments attacked by each argument inside PG.
+        self.attacks = {k: [] for k in self.PG.keys()}
+        for key, value in self.PG.items():
+            for j in value:
+                self.attacks[j].append(key)
+
+        # Arguments of UG out of PG attacking at least one argument of PG: the moves available to the agents.
+        self.frontier = set()
+        for key in self.PG.keys():
+            self.frontier.update(UG[key])
+        self.frontier.difference_update(self.PG.keys())
+
+        # Arguments of UG out of PG attacked by at least one argument of PG: the moves which would not be leaves.
+        self.attacked = set()
+        for key in self.PG.keys():
+            self.attacked.update(self.reverse_index[key])
+        self.attacked.difference_update(self.PG.keys())
+
+        self.acyclic = topological_order(self.PG) is not None
+        self.values = {}
+        self.values = dict(self.evaluate(self.PG))
+
+        # Path factors and ranges of new leaves computed by impact_ranges, valid until the next argument is added. New
+        # dictionaries are created on each change, so that copies of the state can share them.
+        self.factors = {("0", 1): (1, 1), ("0", -1): (1, -1)}
+        self.ranges = {}
+
+    def value(self, argument="0") -> float:
+        """
+        Returns the current harmony score of an argument of PG (the issue by default).
+        """
+
+        return self.values[argument]
+
+    def add_argument(self, argument) -> None:
+        """
+        Adds an argument to the public graph, with its attacks from UG, and updates the values.
+
+        While PG is acyclic, only the arguments downstream of the new one (its path to the issue in a tree)
+        are re-evaluated. If the new argument closes a cycle, the values are recomputed by fixed-point iteration.
+
+        Args:
+            argument (str): The argument to add.
+        """
+
+        # Attacks between the new argument and PG, sorted like generate_subgraph does. A self-attack is kept
+        # among the attackers (and added to the attacks of the argument below).
+        attackers = sorted(a for a in self.UG[argument] if a in self.PG or a == argument)
+        targets = [k for k in self.reverse_index[argument] if k in self.PG]
+
+        for k in targets:
+            insort(self.PG[k], argument)
+        self.PG[argument] = attackers
+        self.attacks[argument] = targets
+        for a in attackers:
+            self.attacks[a].append(argument)
+
+        self.factors = {("0", 1): (1, 1), ("0", -1): (1, -1)}
+        self.ranges = {}
+
+        self.frontier.discard(argument)
+        for a in self.UG[argument]:
+            if a not in self.PG:
+                self.frontier.add(a)
+        self.attacked.discard(argument)
+        for k in self.reverse_index[argument]:
+            if k not in self.PG:
+                self.attacked.add(k)
+
+        if not self.acyclic:
+            self.values = dict(self.evaluate(self.PG))
+            return
+
+        # Arguments whose value depends on the new one.
+        downstream = [argument]
+        seen = {argument}
+        i = 0
+        while i < len(downstream):
+            for k in self.attacks[downstream[i]]:
+                if k not in seen:
+                    seen.add(k)
+                    downstream.append(k)
+            i += 1
+
+        # The new argument closes a cycle if one of its attackers depends on it (itself included).
+        for a in attackers:
+            if a in seen:
+                self.acyclic = False
+                self.values = dict(self.evaluate(self.PG))
+                return
+
+        # Re-evaluate the downstream arguments in topological order.
+        remaining = {k: 0 for k in downstream}
+        for k in downstream:
+            for j in self.PG[k]:
+                if j in seen:
+                    remaining[k] += 1
+
+        order = [argument]
+        i = 0
+        while i < len(order):
+            key = order[i]
+            self.values[key] = self.kernel([self.values[j] for j in self.PG[key]])
+
+            for k in self.attacks[key]:
+                remaining[k] -= 1
+                if remaining[k] == 0:
+                    order.append(k)
+            i += 1
+
+    def evaluate(self, PG: dict) -> dict:
+        """
+        Returns the values of a public graph evaluated from scratch under the semantics of the state (cached when
+        the state has a cache): in one topological pass when it is acyclic, with the fixed-point solver
+        util.Hbs_solve otherwise.
+
+        Args:
+            PG (dict): The public graph, a subgraph of UG.
+
+        Returns:
+            dict: The harmony score of each argument (shared with the cache, it must not be modified).
+        """
+
+        if self.cache is not None:
+            values = self.cache.get(PG.keys(), self.semantics)
+            if values is not None:
+                return values
+
+        if topological_order(PG) is not None:
+            values = semantics_values(PG, self.semantics)
+        else:
+            values = Hbs_solve(PG, self.method, initial=self.values if self.warm_start else None,
+                               stats=self.solver_stats, semantics=self.semantics)
+
+        if self.cache is not None:
+            self.cache.put(PG.keys(), values, self.semantics)
+
+        return values
+
+    def possible_moves(self, OG) -> list:
+        """
+        Returns the arguments of an opinion graph which can be added to the public graph (attacking one of
+        its arguments, and not already in it), sorted like agent.get_possible_next_moves. The frontier
+        is maintained as arguments are added, so this only scans the frontier.
+
+        Args:
+            OG (dict): The opinion graph of an agent.
+
+        Returns:
+            list: The sorted possible moves.
+        """
+
+        return sorted(a for a in self.frontier if a in OG)
+
+    def what_if(self, argument) -> float:
+        """
+        Returns the value the issue would have if the argument was added to the public graph, without changing it.
+
+        When the argument is a new leaf (attacked neither by PG nor by itself) attacking a single argument of PG,
+        and every argument on the way to the issue attacks a single argument too (always the case on a tree), only
+        the values along that path are recomputed. Otherwise, the issue is evaluated on a temporary public graph.
+
+        Args:
+            argument (str): The candidate argument.
+
+        Returns:
+            float: The value of the issue after adding the argument.
+        """
+
+        targets = [k for k in self.reverse_index[argument] if k in self.PG]
+        is_leaf = argument not in self.attacked and argument not in self.UG[argument]
+
+        if not (self.acyclic and is_leaf and len(targets) == 1):
+            temp_PG = generate_subgraph(self.UG, list(self.PG.keys()) + [argument])
+            return self.evaluate(temp_PG)["0"]
+
+        # New value of the target, whose attackers now include the new leaf (of the value of an unattacked argument).
+        key = targets[0]
+        attackers = list(self.PG[key])
+        insort(attackers, argument)
+        leaf_value = self.kernel([])
+        new_value = self.kernel([leaf_value if j == argument else self.values[j] for j in attackers])
+
+        # Propagate the change up to the issue.
+        while key != "0":
+            if len(self.attacks[key]) == 0:
+                return self.values["0"]
+            if len(self.attacks[key]) > 1:
+                temp_PG = generate_subgraph(self.UG, list(self.PG.keys()) + [argument])
+                return self.evaluate(temp_PG)["0"]
+
+            child = key
+            key = self.attacks[key][0]
+            new_value = self.kernel([new_value if j == child else self.values[j] for j in self.PG[key]])
+
+        return new_value
+
+    def score_moves(self, moves: list) -> dict:
+        """
+        Returns the value the issue would have after each candidate move, in a single call.
+
+        Args:
+            moves (list): The candidate arguments.
+
+        Returns:
+            dict: Key : candidate argument, Value : value of the issue after playing it.
+        """
+
+        return {move: self.what_if(move) for move in moves}
+
+    def impact_ranges(self, moves: list) -> dict:
+        """
+        Returns, for each candidate move, a range containing the change of the value of the issue it would cause.
+
+        On a tree, a new leaf lowers the value v of its target by v²/(1+v). A change d in the attackers of an
+        argument of value v changes it in the opposite direction, by at most d.v² when d > 0 and by at most
+        d.v/(1+R) when d < 0 (R being the sum of its other attackers). The bound therefore shrinks with the
+        depth of the target, and its sign alternates along the way. Moves for which the structure is not a
+        tree, and every move under a semantics other than the h-categorizer (see util.register_semantics), get an
+        unbounded range.
+
+        Args:
+            moves (list): The candidate arguments.
+
+        Returns:
+            dict: Key : candidate argument, Value : (low, high) bounds on the change of the value of the issue.
+        """
+
+        infinity = float("inf")
+        unbounded = (-infinity, infinity)
+        if not self.acyclic or self.kernel is not hbs_kernel:
+            return {move: unbounded for move in moves}
+
+        # (factor, sign) turning a change of sign s of an argument into a change of the issue, and the range of a
+        # new leaf on each target. They are kept on the state, so that the agents playing on the same public graph
+        # share them.
+        factors = self.factors
+        target_ranges = self.ranges
+        ranges = {}
+
+        for move in moves:
+            targets = self.reverse_index[move]
+            if len(targets) != 1 or targets[0] not in self.PG:
+                targets = [k for k in targets if k in self.PG]
+            if len(targets) != 1 or move in self.attacked or move in self.UG[move]:
+                ranges[move] = unbounded
+                continue
+
+            target = targets[0]
+            if target in target_ranges:
+                ranges[move] = target_ranges[target]
+                continue
+
+            # Walk up to an argument whose factor is known.
+            path = []
+            key, sign = target, -1
+            while (key, sign) not in factors:
+                if len(self.attacks[key]) == 0:
+                    factors[(key, sign)] = (0, 0) # Disconnected from the issue.
+                elif len(self.attacks[key]) > 1:
+                    factors[(key, sign)] = (infinity, 0)
+                else:
+                    path.append((key, sign))
+                    key, sign = self.attacks[key][0], -sign
+
+            for key, sign in reversed(path):
+                parent = self.attacks[key][0]
+                if sign > 0:
+                    factor = self.values[parent]**2
+                else:
+                    rest = 0
+                    for j in self.PG[parent]:
+                        if j != key:
+                            rest += self.values[j]
+                    factor = self.values[parent] / (1 + rest)
+                parent_factor, parent_sign = factors[(parent, -sign)]
+                factors[(key, sign)] = (factor * parent_factor, parent_sign)
+
+            value = self.values[target]
+            factor, sign = factors[(target, -1)]
+            if factor == infinity:
+                target_ranges[target] = unbounded
+            else:
+                # Small slack so that rounding errors never exclude the actual change.
+                bound = value**2 / (1 + value) * factor * (1 + 10**(-9)) + 10**(-12)
+                if sign > 0:
+                    target_ranges[target] = (-10**(-12), bound)
+                elif sign < 0:
+                    target_ranges[target] = (-bound, 10**(-12))
+                else:
+                    target_ranges[target] = (-10**(-12), 10**(-12))
+            ranges[move] = target_ranges[target]
+
+        return ranges
+
+    def copy(self):
+        """
+        Returns an independent copy of the debate state (sharing UG, its reverse index, the cache and the solver
+        statistics), used to fork a debate at a given point.
+        """
+
+        state = DebateState.__new__(DebateState)
+        state.UG = self.UG
+        state.cache = self.cache
+        state.warm_start = self.warm_start
+        state.method = self.method
+        state.semantics = self.semantics
+        state.kernel = self.kernel
+        state.solver_stats = self.solver_stats
+        state.reverse_index = self.reverse_index
+        state.PG = {k: list(v) for k, v in self.PG.items()}
+        state.attacks = {k: list(v) for k, v in self.attacks.items()}
+        state.frontier = set(self.frontier)
+        state.attacked = set(self.attacked)
+        state.acyclic = self.acyclic
+        state.values = dict(self.values)
+        state.factors = self.factors
+        state.ranges = self.ranges
+
+        return state
@@ -14,15 +14,27 @@ from src.IO_graph_apx import *
 from src.agent import *
 from src.game import *
 from src.util import *
+from src.generation import generate_debate_graph, generate_opinion_graphs
+from src.debate_state import DebateState
+from src.results_io import result_row, result_row_2, CSVResultSink, open_result_sink
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from statistics import NormalDist
 
-def initialize_agents(UG, number_of_agents) -> list:
+def initialize_agents(UG, number_of_agents, reverse_index=None, semantics="hbs", bulk=False, seed=None) -> list:
     """
     Initializes a list of agents to participate in the debate.
 
     Args:
     - UG (dict): The universe graph representing the entire argumentation framework.
     - number_of_agents (int): The number of agents participating in the debate.
+    - reverse_index (dict): The reverse adjacency list of UG, shared by all the agents (default is None, built here).
+    - semantics (str): The gradual semantics giving the value of the opinion of the agents (default is "hbs").
+    - bulk (bool): Whether the OGs and their numbers of attacks are generated all at once with NumPy
+      (generation.generate_opinion_graphs, seeded by seed) instead of one by one with random (default is False).
+      The values of the agents are computed by util.opinion_value in both cases, like in every other driver.
+    - seed (int): The seed of the bulk generation (default is None).
 
     Returns:
     - list: A list of initialized agents with automatically generated argument graphs (AGs).
@@ -31,20 +43,40 @@ def initialize_agents(UG, number_of_agents) -> list:
     # Initialize agents.
     agents = []
     
+    if reverse_index is None:
+        reverse_index = build_reverse_adjacency_list(UG)
+
     # Create agents with automatically generated OG.
+    if bulk:
+        OGs, nbAtts, _ = generate_opinion_graphs(UG, number_of_agents, seed=seed)
+    else:
+        OGs = [auto_generate_OG(UG) for _ in range(number_of_agents)]
+        nbAtts = [None] * number_of_agents
+
     for k in range(number_of_agents):
-        OG = auto_generate_OG(UG)
-        agents.append(agent(k, OG, UG))
+        agents.append(agent(k, OGs[k], UG, reverse_index=reverse_index, semantics=semantics, nbAtt=nbAtts[k]))
 
     return agents
 
-def run_protocol(UG: dict, agents: list) -> float | dict:
+def check_semantics(agents: list, semantics: str) -> None:
+    """
+    Raises a ValueError if the value of the opinion of an agent is not given by the semantics of the debate.
+    """
+
+    for a in agents:
+        if a.semantics != semantics:
+            raise ValueError(f"The agent {a.name} uses the semantics {a.semantics}, but the debate uses {semantics}.")
+
+def run_protocol(UG: dict, agents: list, reverse_index=None, cache=None, semantics="hbs") -> float | dict:
     """
     Simulates a debate game with automatically generated agents and argumentation frameworks.
     
     Args:
     - UG (dict) : The universe graph representing the entire argumentation framework.
     - agents (list) : The list of the agents participating in the debate.
+    - reverse_index (dict) : The reverse adjacency list of UG, shared between orders (default is None, built from UG).
+    - cache (HbsCache) : A cache of the values of the public graphs met on UG, shared between orders (default is None).
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
 
     Returns:
     - float: The final value of the issue of the debate.
@@ -54,28 +86,46 @@ def run_protocol(UG: dict, agents: list) -> float | dict:
     - int : number of turn needed to end the debate.
     """
 
-    nb_turn = 0 
-    PG = {"0":[]} # Initialize public graph.
-    previous_PG = {}
+    check_semantics(agents, semantics)
+    state = DebateState(UG, reverse_index=reverse_index, cache=cache, semantics=semantics) # Initialize public graph.
+
+    return continue_protocol(state, agents)
+
+def continue_protocol(state, agents: list, nb_turn=0, played=True) -> float | dict:
+    """
+    Runs the debate from a given state until no arguments are presented in a turn.
+
+    Args:
+    - state (DebateState) : The current state of the debate, updated in place.
+    - agents (list) : The list of the agents participating in the debate, in order.
+    - nb_turn (int) : The number of turns already completed (default is 0).
+    - played (bool) : Whether an argument was presented during the last completed turn (default is True).
+
+    Returns:
+    - The same results as run_protocol.
+    """
+
     number_of_agents = len(agents)
     historical = []
 
     # Run the debate until no arguments are presented in a turn.
-    while(PG != previous_PG):
+    while(played):
         
         nb_turn += 1
-        previous_PG = PG
+        played = False
 
         # Iterate through each agent to make their move.
         for k in range(number_of_agents):
             
-            PG = agents[k].best_next_move(PG, UG, nb_turn)
+            if agents[k].best_next_move(state, nb_turn) is not None:
+                played = True
 
     for k in range(number_of_agents):
         historical.append(agents[k].historical)
 
     # Debate conclusion.
-    final_Vp = Hbs(PG, "0")
+    PG = state.PG
+    final_Vp = state.value("0")
     
     agent_names = []
     for a in agents:     
@@ -84,7 +134,533 @@ def run_protocol(UG: dict, agents: list) -> float | dict:
     agent_names = ",".join(agent_names)   
     return final_Vp, PG, agent_names, agents, nb_turn
 
-def find_all_combinations(agents) -> list:
+def _explore_orders(UG: dict, agents: list, reverse_index, cache, semantics="hbs", start=0, stop=None,
+                    orders=None):
+    """
+    Runs the protocol for a set of orders of the agents explored as a trie: orders sharing their first agents
+    share the first turn up to that point, the debate state being copied at each divergence point instead of
+    being replayed from {"0":[]}. The historical of the agents is set for the current order when each result is
+    yielded, and reset at the end.
+
+    The orders are either those of index start to stop-1 in the order of find_all_combinations (only the subtrees
+    of the trie overlapping this contiguous shard are explored, without enumerating the other orders), or the
+    given list of orders.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - reverse_index (dict) : The reverse adjacency list of UG.
+    - cache (HbsCache) : A cache of the values of the public graphs met on UG, or None.
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+    - start (int) : The index of the first order to run (default is 0).
+    - stop (int) : The index after the last order to run (default is None, up to the last order).
+    - orders (list) : The distinct orders to run instead, as tuples of indices in agents, all of the same length
+    (default is None, the orders of index start to stop-1).
+
+    Yields:
+    - (order, results of run_protocol) for each order, as a tuple of indices in agents.
+    """
+
+    number_of_agents = len(agents)
+    if orders is None:
+        length = number_of_agents
+        if stop is None:
+            stop = factorial(number_of_agents)
+    elif len(orders) > 0:
+        length = len(orders[0])
+    else:
+        return
+    first_moves = {}
+
+    def explore(state, prefix, played, subset):
+
+        # Every agent of the order has played its first turn, run the rest of the debate.
+        if len(prefix) == length:
+            yield tuple(prefix), continue_protocol(state, [agents[i] for i in prefix], 1, played)
+            return
+
+        # Subtrees of the next agents: with the index of their first order, restricted to the shard, or with
+        # their orders.
+        if orders is None:
+            remaining = [i for i in range(number_of_agents) if i not in prefix]
+            size = factorial(number_of_agents - len(prefix) - 1)
+            branches = []
+            for r, i in enumerate(remaining):
+                branch_index = subset + r*size
+                if branch_index < stop and branch_index + size > start:
+                    branches.append((i, branch_index))
+        else:
+            grouped = {}
+            for order in subset:
+                grouped.setdefault(order[len(prefix)], []).append(order)
+            branches = list(grouped.items())
+
+        for n, (i, branch) in enumerate(branches):
+
+            # Restore the historical of the agents at this point of the first turn.
+            for k in range(number_of_agents):
+                agents[k].historical = {1: first_moves[k]} if k in prefix else dict()
+
+            # The last branch can reuse the state, no longer needed by the others.
+            child = state if n == len(branches) - 1 else state.copy()
+            first_moves[i] = agents[i].best_next_move(child, 1)
+
+            yield from explore(child, prefix + [i], played or first_moves[i] is not None, branch)
+
+    yield from explore(DebateState(UG, reverse_index=reverse_index, cache=cache, semantics=semantics), [], False,
+                       0 if orders is None else list(orders))
+
+    # Reset agent historical once every order has been played.
+    for a in agents:
+        a.historical = dict()
+
+def run_all_protocols(UG: dict, agents: list, reverse_index=None, cache=None, start=0, stop=None, semantics="hbs"):
+    """
+    Runs the protocol for every order of the agents, in the order of find_all_combinations, sharing the first
+    turn of the orders with a common prefix (see _explore_orders).
+    The historical of the agents is set for the current order when each result is yielded.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - reverse_index (dict) : The reverse adjacency list of UG (default is None, built from UG).
+    - cache (HbsCache) : A cache of the values of the public graphs met on UG (default is None).
+    - start (int) : The index of the first order to run (default is 0).
+    - stop (int) : The index after the last order to run (default is None, up to the last order).
+    Only the subtrees of the trie overlapping this contiguous shard of orders are explored.
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+
+    Yields:
+    - The results of run_protocol for each order of the agents.
+    """
+
+    check_semantics(agents, semantics)
+    if reverse_index is None:
+        reverse_index = build_reverse_adjacency_list(UG)
+
+    for _, results in _explore_orders(UG, agents, reverse_index, cache, semantics, start, stop):
+        yield results
+
+def run_order_list(UG: dict, agents: list, orders: list, reverse_index=None, cache=None, semantics="hbs"):
+    """
+    Runs the protocol for each of the given orders, sharing the first turn of the orders with a common prefix
+    (see _explore_orders). The historical of the agents is set for the current order when each result is yielded.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - orders (list) : The distinct orders to run, as tuples of indices in agents, all of the same length.
+    - reverse_index (dict) : The reverse adjacency list of UG (default is None, built from UG).
+    - cache (HbsCache) : A cache of the values of the public graphs met on UG (default is None).
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+
+    Yields:
+    - (order, results of run_protocol) for each order, the orders sharing a prefix being yielded together.
+    """
+
+    check_semantics(agents, semantics)
+    if reverse_index is None:
+        reverse_index = build_reverse_adjacency_list(UG)
+
+    yield from _explore_orders(UG, agents, reverse_index, cache, semantics, orders=orders)
+
+# Universe graph and agents of the current worker process (see _run_in_pool).
+_worker_context = {}
+
+def _init_worker(UG: dict, agents: list, semantics="hbs") -> None:
+    """
+    Stores the universe graph and a private copy of the agents in a worker process.
+    """
+
+    _worker_context["UG"] = UG
+    _worker_context["agents"] = agents
+    _worker_context["reverse_index"] = build_reverse_adjacency_list(UG)
+    _worker_context["cache"] = HbsCache()
+    _worker_context["semantics"] = semantics
+
+def _run_orders_task(shard: tuple) -> tuple:
+    """
+    Runs, in a worker process, a shard of orders of the agents: (start, stop, None) for the orders of index
+    start to stop-1, (None, None, orders) for a list of orders (see _explore_orders).
+
+    Returns:
+    - list : (order, Vp, PG, agent names, number of turns, historical of each agent of the order) for each order.
+    - list : The move statistics gathered by each agent during the task.
+    """
+
+    agents = _worker_context["agents"]
+    for a in agents:
+        a.move_stats = {"evaluated": 0, "pruned": 0}
+
+    results = []
+    start, stop, orders = shard
+    for order, (vp, PG, names, _, nb_turn) in _explore_orders(_worker_context["UG"], agents,
+                                                              _worker_context["reverse_index"], _worker_context["cache"],
+                                                              _worker_context["semantics"], start or 0, stop, orders):
+        results.append((order, vp, PG, names, nb_turn, [dict(agents[i].historical) for i in order]))
+
+    return results, [a.move_stats for a in agents]
+
+def _run_in_pool(UG: dict, agents: list, shards: list, workers: int, semantics="hbs"):
+    """
+    Runs shards of orders of the agents (see _run_orders_task) on a pool of worker processes, each one playing on
+    its own copy of the agents. The move statistics of the workers are added to those of the agents.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - shards (list) : The shards of orders, as (start, stop, orders) tuples.
+    - workers (int) : The number of worker processes.
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+
+    Yields:
+    - (order, Vp, PG, agent names, number of turns, historical of each agent of the order) for each order, shard
+    after shard.
+    """
+
+    check_semantics(agents, semantics)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(UG, agents, semantics)) as executor:
+        for results, move_stats in executor.map(_run_orders_task, shards):
+
+            for a, worker_stats in zip(agents, move_stats):
+                for key in worker_stats:
+                    a.move_stats[key] += worker_stats[key]
+
+            yield from results
+
+def play_all_orders(UG: dict, agents: list, workers=1, reverse_index=None, cache=None, symmetry=True, stats=None,
+                    semantics="hbs"):
+    """
+    Runs the protocol for every order of the agents, optionally split across a pool of worker processes.
+
+    With several workers, the permutation space is split into contiguous index shards (a few per worker), each
+    one run by run_all_protocols without enumerating the others, and the results are merged back in the order of
+    find_all_combinations. Every worker plays on its own copy of the agents; the historical of the given agents
+    is set for each yielded order.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - workers (int) : The number of worker processes (default is 1, everything runs in this process).
+    - reverse_index (dict) : The reverse adjacency list of UG, used when running in this process (default is None).
+    - cache (HbsCache) : A cache of Hbs values, used when running in this process (default is None).
+    - symmetry (bool) : Whether to simulate only one order per class of equivalent orders when some agents are
+    interchangeable or inert (default is True, see run_all_protocols_with_symmetry). The results are the same.
+    When it applies, symmetry takes precedence over the enumeration of every order: the representative orders
+    are then run with the same first-turn sharing and split across the same number of workers.
+    - stats (dict) : If given, filled with the number of orders, the number of simulated orders, the agents of
+    the interacting group and whether the debate is order independent (see interacting_groups).
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+
+    Yields:
+    - The results of run_protocol for each order of the agents.
+    """
+
+    number_of_agents = len(agents)
+    if stats is not None:
+        groups = interacting_groups(UG, agents)
+        stats.update({"orders": factorial(number_of_agents), "simulated": factorial(number_of_agents),
+                      "interacting_agents": [agents[k].get_number() for k in groups[0]],
+                      "order_independent": len(groups[0]) <= 1})
+
+    # Simulate one order per class of equivalent orders when some agents can be swapped.
+    if symmetry:
+        classes = agent_equivalence_classes(UG, agents)
+        if len(set(classes)) < number_of_agents or None in classes:
+            yield from run_all_protocols_with_symmetry(UG, agents, classes, reverse_index, cache, stats, semantics,
+                                                       workers)
+            return
+
+    if workers <= 1 or number_of_agents < 2:
+        yield from run_all_protocols(UG, agents, reverse_index, cache, semantics=semantics)
+        return
+
+    # A few shards per worker, to balance the load.
+    orderings = agent_order_combinations(agents)
+    shard_size = -(-len(orderings) // (4 * workers))
+
+    shards = [(start, stop, None) for start, stop in orderings.shards(shard_size)]
+
+    for indices, vp, PG, order, nb_turn, historicals in _run_in_pool(UG, agents, shards, workers, semantics):
+        agent_order = [agents[i] for i in indices]
+        for a, historical in zip(agent_order, historicals):
+            a.historical = historical
+        yield vp, PG, order, agent_order, nb_turn
+
+    # Reset agent historical once every order has been played.
+    for a in agents:
+        a.historical = dict()
+
+def reachable_arguments(UG: dict, agents: list) -> set:
+    """
+    Returns the arguments that may ever enter the public graph: the issue, and (until a fixed point is reached)
+    every argument of some agent's OG attacking an argument already reachable.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+
+    Returns:
+    - set : The reachable arguments.
+    """
+
+    candidates = set()
+    for a in agents:
+        candidates |= set(a.OG.keys())
+
+    reachable = {"0"}
+    frontier = ["0"]
+    while len(frontier) > 0:
+        target = frontier.pop()
+        for arg in UG[target]:
+            if arg in candidates and arg not in reachable:
+                reachable.add(arg)
+                frontier.append(arg)
+
+    return reachable
+
+def interacting_groups(UG: dict, agents: list) -> list:
+    """
+    Splits the agents into groups whose relative order may change the debate.
+
+    An agent with no reachable argument in its OG never plays, whatever the order: it forms a group of its own.
+    Every other agent may play. This is the only split made: any move changes the value of the issue, and thus
+    the comfort and the choices of all the other agents, even when their OGs share no argument, so the agents
+    which may play form a single interacting group. When this group has at most one agent, every order of the
+    agents yields the same debate.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+
+    Returns:
+    - list : The groups of agent indices, the interacting group (possibly empty) first.
+    """
+
+    reachable = reachable_arguments(UG, agents)
+
+    active = []
+    inert = []
+    for k, a in enumerate(agents):
+        if any(arg != "0" and arg in reachable for arg in a.OG.keys()):
+            active.append(k)
+        else:
+            inert.append([k])
+
+    return [active] + inert
+
+def agent_equivalence_classes(UG: dict, agents: list) -> list:
+    """
+    Groups the agents whose behaviour is interchangeable in the protocol.
+
+    Agents with the same opinion graph and comfort level always make the same moves: swapping them in an order
+    only swaps their historical. Agents outside the interacting group (see interacting_groups) never play,
+    whatever the order: they are inert.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+
+    Returns:
+    - list : For each agent, the index of the first agent of its class, or None if the agent is inert.
+    """
+
+    active = set(interacting_groups(UG, agents)[0])
+
+    classes = []
+    signatures = {}
+    for k, a in enumerate(agents):
+        if k not in active:
+            classes.append(None)
+            continue
+
+        signature = (frozenset(a.OG.keys()), a.cl, a.Vk)
+        classes.append(signatures.setdefault(signature, k))
+
+    return classes
+
+def run_all_protocols_with_symmetry(UG: dict, agents: list, classes: list, reverse_index=None, cache=None, stats=None,
+                                    semantics="hbs", workers=1):
+    """
+    Runs the protocol for every order of the agents, in the order of find_all_combinations, simulating only one
+    order per class of equivalent orders (see agent_equivalence_classes).
+
+    Two orders are equivalent when they have the same sequence of classes once the inert agents are removed.
+    Only the non-inert agents of the first order of each class are simulated, with run_order_list (sharing the
+    first turn of the simulated orders), split across a pool of worker processes when workers > 1. Every order
+    is then expanded back: the i-th agent of a class gets the historical of the i-th agent of that class in the
+    simulated order, and inert agents get None at every turn.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - classes (list) : The class of each agent, as returned by agent_equivalence_classes.
+    - reverse_index (dict) : The reverse adjacency list of UG (default is None, built from UG).
+    - cache (HbsCache) : A cache of the values of the public graphs met on UG (default is None).
+    - stats (dict) : If given, filled with the number of orders and the number of simulated orders.
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+    - workers (int) : The number of worker processes running the simulated orders (default is 1, everything runs
+    in this process).
+
+    Yields:
+    - The results of run_protocol for each order of the agents.
+    """
+
+    if reverse_index is None:
+        reverse_index = build_reverse_adjacency_list(UG)
+
+    orderings = agent_order_combinations(agents)
+
+    # First order (restricted to its non-inert agents) of each class of equivalent orders.
+    representatives = {}
+    for indices in orderings.indices():
+        signature = tuple(classes[i] for i in indices if classes[i] is not None)
+        if signature not in representatives:
+            representatives[signature] = tuple(i for i in indices if classes[i] is not None)
+
+    # Simulate the representative orders. Key : signature, Value : (Vp, PG, number of turns, historicals).
+    simulated = {}
+    orders = sorted(representatives.values())
+
+    if workers <= 1 or len(orders) < 2:
+        for order, (vp, PG, _, _, nb_turn) in run_order_list(UG, agents, orders, reverse_index, cache, semantics):
+            simulated[tuple(classes[i] for i in order)] = (vp, PG, nb_turn, [dict(agents[i].historical) for i in order])
+    else:
+        # A few contiguous shards of the sorted orders per worker, so that each shard keeps its common prefixes.
+        shard_size = -(-len(orders) // (4 * workers))
+        shards = [(None, None, orders[k:k+shard_size]) for k in range(0, len(orders), shard_size)]
+
+        for order, vp, PG, _, nb_turn, historicals in _run_in_pool(UG, agents, shards, workers, semantics):
+            simulated[tuple(classes[i] for i in order)] = (vp, PG, nb_turn, historicals)
+
+    for indices in orderings.indices():
+        signature = tuple(classes[i] for i in indices if classes[i] is not None)
+        active = [agents[i] for i in indices if classes[i] is not None]
+        vp, PG, nb_turn, historicals = simulated[signature]
+
+        # Expand the simulated order to this one.
+        for a, historical in zip(active, historicals):
+            a.historical = dict(historical)
+        for i in indices:
+            if classes[i] is None:
+                agents[i].historical = {turn: None for turn in range(1, nb_turn+1)}
+
+        agent_order = [agents[i] for i in indices]
+        order = ",".join(f"A{a.get_number()}" for a in agent_order)
+        yield vp, PG, order, agent_order, nb_turn
+
+    if stats is not None:
+        stats.update({"orders": len(orderings), "simulated": len(simulated)})
+
+    # Reset agent historical once every order has been played.
+    for a in agents:
+        a.historical = dict()
+
+def sample_protocols(UG: dict, agents: list, summary: dict, half_width=0.01, confidence=0.95, min_samples=30,
+                     max_samples=100000, stratified=False, seed=None, reverse_index=None, cache=None, semantics="hbs"):
+    """
+    Runs the protocol on randomly drawn orders of the agents, until the mean of Vp over all orders is known
+    with the requested precision, instead of enumerating the n! orders.
+
+    Orders are drawn uniformly, or stratified by first speaker (each agent speaks first in turn, the other
+    agents being shuffled uniformly). The running mean and variance of Vp (Welford), the half-width of the
+    confidence interval of the mean and the mean Vp of each agent at each position are kept in summary.
+
+    Args:
+    - UG (dict) : The universe graph representing the entire argumentation framework.
+    - agents (list) : The list of the agents participating in the debate.
+    - summary (dict) : Filled and updated after each sample with the sample count, mean, variance (pooled over the strata),
+    achieved half-width, confidence, whether the precision was reached, and the position effects.
+    - half_width (float) : The requested half-width of the confidence interval of the mean of Vp (default is 0.01).
+    - confidence (float) : The confidence level of the interval (default is 0.95).
+    - min_samples (int) : The minimum number of orders to draw (default is 30).
+    - max_samples (int) : The maximum number of orders to draw (default is 100000).
+    - stratified (bool) : Whether to stratify the orders by first speaker (default is False, uniform orders).
+    - seed (int) : The seed of the random generator (default is None).
+    - reverse_index (dict) : The reverse adjacency list of UG (default is None, built from UG).
+    - cache (HbsCache) : A cache of the values of the public graphs met on UG (default is None).
+    - semantics (str) : The gradual semantics of the debate (default is "hbs", see util.SEMANTICS).
+
+    Yields:
+    - The results of run_protocol for each drawn order of the agents.
+    """
+
+    rng = random.Random(seed)
+    if reverse_index is None:
+        reverse_index = build_reverse_adjacency_list(UG)
+
+    number_of_agents = len(agents)
+    nb_orders = factorial(number_of_agents)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    # Welford accumulators (count, mean, sum of squared deviations), one per stratum.
+    nb_strata = number_of_agents if stratified else 1
+    strata = [[0, 0.0, 0.0] for _ in range(nb_strata)]
+
+    # Sum and count of Vp for each agent at each position.
+    position_sums = {a.get_number(): [0.0] * number_of_agents for a in agents}
+    position_counts = {a.get_number(): [0] * number_of_agents for a in agents}
+
+    summary.update({"samples": 0, "orders": nb_orders, "mean": None, "variance": None, "half_width": None,
+                    "confidence": confidence, "target_half_width": half_width, "stratified": stratified,
+                    "converged": False, "position_effects": {}})
+
+    for sample in range(max_samples):
+
+        # Draw an order of the agents.
+        if stratified:
+            stratum = sample % number_of_agents
+            others = [i for i in range(number_of_agents) if i != stratum]
+            rng.shuffle(others)
+            indices = [stratum] + others
+        else:
+            stratum = 0
+            indices = nth_permutation(number_of_agents, rng.randrange(nb_orders))
+
+        for a in agents:
+            a.historical = dict()
+
+        result = run_protocol(UG, [agents[i] for i in indices], reverse_index, cache, semantics)
+        vp = result[0]
+
+        # Update the running estimates.
+        accumulator = strata[stratum]
+        accumulator[0] += 1
+        delta = vp - accumulator[1]
+        accumulator[1] += delta / accumulator[0]
+        accumulator[2] += delta * (vp - accumulator[1])
+
+        for position, i in enumerate(indices):
+            position_sums[agents[i].get_number()][position] += vp
+            position_counts[agents[i].get_number()][position] += 1
+
+        # Mean of the strata means (each first speaker has probability 1/n) and variance of that estimate.
+        nb_samples = sample + 1
+        if all(acc[0] >= 2 for acc in strata):
+            mean = sum(acc[1] for acc in strata) / nb_strata
+            variance = sum(acc[2] / (acc[0] - 1) / acc[0] for acc in strata) / nb_strata**2
+            pooled = sum(acc[2] for acc in strata) / (nb_samples - 1)
+            achieved = z * variance**0.5
+            summary.update({"mean": mean, "variance": pooled, "half_width": achieved})
+        else:
+            achieved = None
+
+        summary["samples"] = nb_samples
+        summary["position_effects"] = {number: [position_sums[number][p] / position_counts[number][p]
+                                                if position_counts[number][p] > 0 else None for p in range(number_of_agents)]
+                                       for number in position_sums}
+
+        yield result
+
+        if achieved is not None and nb_samples >= min_samples and achieved <= half_width:
+            summary["converged"] = True
+            break
+
+    # Reset agent historical once every sample has been played.
+    for a in agents:
+        a.historical = dict()
+
+def find_all_combinations(agents) -> AgentOrderings:
     """
     Generates all possible combinations of agent orderings from the given list.
 
@@ -92,78 +668,59 @@ def find_all_combinations(agents) -> list:
     - agents (list): A list of agents.
 
     Returns:
-    - list: A list containing all possible combinations of agent orderings.
+    - AgentOrderings: A lazy sequence of all possible combinations of agent orderings (see agent_order_combinations).
     """
-     # Generate all possible permutations of agent indices.
-    agent_indices = range(len(agents))
-    permutations_indices = permutations(agent_indices)
 
-    # For each permutation of indices, create a corresponding list of agents.
-    agent_combinations = []
-    for perm_indices in permutations_indices:
-        agent_order = [agents[i] for i in perm_indices]
-        agent_combinations.append(agent_order)
+    return agent_order_combinations(agents)
 
-    return agent_combinations
-
-def generate_debate(numberOfAgents: int) -> None:
+def generate_debate(numberOfAgents: int, workers=1, result_format="csv", pg_archive=False, generator="networkx",
+                    seed=None) -> None:
     """
     Generate a debate based on the given number of agents.
 
     Args:
         numberOfAgents (int): The number of agents participating in the debate.
+        workers (int): The number of worker processes running the agent orders (default is 1).
+        result_format (str): "csv" (default) for the two csv files, or "npz" for typed columns (see results_io.NPZResultSink).
+        pg_archive (bool): Whether to pack the public graph of every order into a single public_graphs.json.gz archive
+        (see IO_graph_apx.PublicGraphArchive) instead of writing one .apx file per order (default is False).
+        generator (str): "networkx" (default) for util.debate_graph_generation, or "numpy" for
+        generation.generate_debate_graph, which builds the universe graph directly without networkx.
+        seed (int): The seed of the numpy generator (default is None).
 
     Returns:
         None
     """
 
-    # Generate the debate graph as a networkx.classes.digraph.DiGraph
-    generated_graph = debate_graph_generation()
-    
-    # Export the networkx.classes.digraph.DiGraph to an APX file into a subfolder of the results folder and returns it
-    debate_results_folder_name = export_DiGraph_as_apx("universe_graph", generated_graph)
+    if generator == "numpy":
+        # Generate the universe graph and write it into a new subfolder of the results folder
+        debate_results_folder_name = create_debate_folder()
+        universe_graph = generate_debate_graph(apx_path="results/"+ debate_results_folder_name +"/universe_graph.apx", seed=seed)
+
+    else:
+        # Generate the debate graph as a networkx.classes.digraph.DiGraph
+        generated_graph = debate_graph_generation()
+
+        # Export the networkx.classes.digraph.DiGraph to an APX file into a subfolder of the results folder and returns it
+        debate_results_folder_name = export_DiGraph_as_apx("universe_graph", generated_graph)
 
-    # Read the universe graph from the APX file
-    universe_graph = read_graph_from_apx("results/"+ debate_results_folder_name +"/universe_graph.apx")
+        # Read the universe graph from the APX file
+        universe_graph = read_graph_from_apx("results/"+ debate_results_folder_name +"/universe_graph.apx")
     
+    # Reverse index of the universe graph, shared by the agents and the debates.
+    reverse_index = build_reverse_adjacency_list(universe_graph)
+    cache = HbsCache()
+
     # Initialize agents with the universe graph
     number_of_agents = numberOfAgents
-    agents = initialize_agents(universe_graph, number_of_agents)
-    
-    # Generate all agent order combinations
-    agent_combinations = agent_order_combinations(agents)
-
-    # Initialize csv columns
-    data = {"order":[], "Vp":[], "numberOfTurn":[]}
+    agents = initialize_agents(universe_graph, number_of_agents, reverse_index)
 
     j = 0
     results_folder = "results/"
     for a in agents:
         export_apx(results_folder+debate_results_folder_name, f"opinion_graph_{j}", a.OG)
-        data[a.get_number()] = []
         j += 1
 
-    # Data for csv2
-    data_2 = {"order":[], "Vp":[], "numberOfTurn":[], "turnHistory":[]}
-
-    # Run the protocol for each agent order combination
-    for agent_order in agent_combinations:
-        
-        vp, public_graph, order, agents, nb_turn = run_protocol(universe_graph, agent_order)
-
-        # Export results in apx and csv
-        export_apx(results_folder+debate_results_folder_name, order, public_graph)
-        exported_data = export_results(data, public_graph, order, vp, nb_turn, agents)
-        exported_data_2 = export_results_2(data_2, order, vp, nb_turn, agents)
-
-        # Reset agent historical for next debate orders
-        for a in agent_order:
-            a.historical = dict()
-    
-    # Create csv files
-    df = pd.DataFrame(exported_data)
-    df2 = pd.DataFrame(exported_data_2)
-
     # Main csv folder which will contain every other csv folders
     csv_folder = "csv"
     if not os.path.exists(csv_folder):
@@ -177,17 +734,33 @@ def generate_debate(numberOfAgents: int) -> None:
     if not os.path.exists(csv_2_pathname):
         os.mkdir(csv_2_pathname)
 
+    # Csv files, written as the orders are played.
     debate_number = debate_results_folder_name.split("_")[1]
-    df.to_csv(f"{csv_1_pathname}/debate_{debate_number}_data.csv", index=False)
-    df2.to_csv(f"{csv_2_pathname}/debate_{debate_number}_data_2.csv", index=False)
+    with open_result_sink(f"{csv_1_pathname}/debate_{debate_number}_data.csv",
+                          f"{csv_2_pathname}/debate_{debate_number}_data_2.csv", agents, result_format) as sink, \
+         (PublicGraphArchive(results_folder+debate_results_folder_name + "/public_graphs.json.gz") if pg_archive else nullcontext()) as archive:
 
-def replay_debate(debate_path: str, numberOfAgents: int) -> None:
+        # Run the protocol for each agent order combination
+        for vp, public_graph, order, agent_order, nb_turn in play_all_orders(universe_graph, agents, workers, reverse_index, cache):
+
+            # Export results in apx (or in the archive) and csv
+            if pg_archive:
+                archive.add(order, public_graph)
+            else:
+                export_apx(results_folder+debate_results_folder_name, order, public_graph)
+            sink.add(public_graph, order, vp, nb_turn, agent_order)
+
+def replay_debate(debate_path: str, numberOfAgents: int, workers=1, result_format="csv", pg_archive=False) -> None:
     """
     Replays the debate with the given debate number.
 
     Args:
         debate_path (str): The path of the debate to replay.
         numberOfAgents (int): The number of agents participating in the debate.
+        workers (int): The number of worker processes running the agent orders (default is 1).
+        result_format (str): "csv" (default) for the two csv files, or "npz" for typed columns (see results_io.NPZResultSink).
+        pg_archive (bool): Whether to pack the public graph of every order into a single public_graphs.json.gz archive
+        (see IO_graph_apx.PublicGraphArchive) instead of writing one .apx file per order (default is False).
 
     Returns:
         None
@@ -218,44 +791,21 @@ def replay_debate(debate_path: str, numberOfAgents: int) -> None:
         
     # Get UG from the debate to replay.
     universe_graph_name = "universe_graph"
-    UG = read_graph_from_apx(debate_path+"/"+universe_graph_name+".apx")
+    UG = read_graph_from_apx(debate_path+"/"+universe_graph_name+".apx", cache=True)
 
     # export UG as apx file in the replay path.
     export_apx(replays_folder+new_sub_folder, universe_graph_name, UG)
 
+    # Reverse index of the universe graph, shared by the agents and the debates.
+    reverse_index = build_reverse_adjacency_list(UG)
+    cache = HbsCache()
+
     # Initialize agent list and their opinion graph
     agents = []
     for i in range(int(numberOfAgents)):
-        opinion_graph_file = f"{debate_path}/opinion_graph_{i}.apx"
-        agents.append(agent(i, read_graph_from_apx(opinion_graph_file), UG))
+        agents.append(agent(i, read_graph_from_apx(f"{debate_path}/opinion_graph_{i}.apx"), UG, reverse_index=reverse_index))
         export_apx(replays_folder+new_sub_folder, f"opinion_graph_{i}", agents[i].OG)
 
-    # Initialize csv columns
-    data = {"order":[], "Vp":[], "numberOfTurn":[]}
-
-    j = 0
-    for a in agents:
-        data[a.get_number()] = []
-        j += 1
-    
-    combinations = find_all_combinations(agents)
-    data_2 = {"order":[], "Vp":[], "numberOfTurn":[], "turnHistory":[]}
-
-    # Run the protocol for each agent order combination
-    for agent_order in combinations:
-        
-        vp, public_graph, order, agents, nb_turn = run_protocol(UG, agent_order)
-
-        # Export results in apx and csv
-        export_apx(replays_folder+new_sub_folder, order, public_graph)
-        data = export_results(data, public_graph, order, vp, nb_turn, agents)
-        exported_data_2 = export_results_2(data_2, order, vp, nb_turn, agents)
-        for a in agent_order:
-            a.historical = dict()
-    
-    df = pd.DataFrame(data)
-    df2 = pd.DataFrame(exported_data_2)
-
     # Main csv folder which will contain every other csv folders
     csv_folder = "csv"
     if not os.path.exists(csv_folder):
@@ -269,16 +819,33 @@ def replay_debate(debate_path: str, numberOfAgents: int) -> None:
     if not os.path.exists(csv_2_pathname):
         os.mkdir(csv_2_pathname)
 
-    df.to_csv(f"{csv_1_pathname}/{new_sub_folder}_data.csv", index=False)
-    df2.to_csv(f"{csv_2_pathname}/{new_sub_folder}_data_2.csv", index=False)
+    # Csv files, written as the orders are played.
+    with open_result_sink(f"{csv_1_pathname}/{new_sub_folder}_data.csv",
+                          f"{csv_2_pathname}/{new_sub_folder}_data_2.csv", agents, result_format) as sink, \
+         (PublicGraphArchive(replays_folder+new_sub_folder + "/public_graphs.json.gz") if pg_archive else nullcontext()) as archive:
+
+        # Run the protocol for each agent order combination
+        for vp, public_graph, order, agent_order, nb_turn in play_all_orders(UG, agents, workers, reverse_index, cache):
+
+            # Export results in apx (or in the archive) and csv
+            if pg_archive:
+                archive.add(order, public_graph)
+            else:
+                export_apx(replays_folder+new_sub_folder, order, public_graph)
+            sink.add(public_graph, order, vp, nb_turn, agent_order)
     
-def replay_debate_with_new_agents(debate_path: str, number_agents: int, csv_folder="csv") -> None:
+def replay_debate_with_new_agents(debate_path: str, number_agents: int, csv_folder="csv", workers=1, result_format="csv", pg_archive=False) -> None:
     """
     Replays the debate with the given debate number.
 
     Args:
         debate_path (str): The path of the debate to replay.
         number_agents (int): The number of agents.
+        csv_folder (str): The folder where the csv files are written (default is "csv").
+        workers (int): The number of worker processes running the agent orders (default is 1).
+        result_format (str): "csv" (default) for the two csv files, or "npz" for typed columns (see results_io.NPZResultSink).
+        pg_archive (bool): Whether to pack the public graph of every order into a single public_graphs.json.gz archive
+        (see IO_graph_apx.PublicGraphArchive) instead of writing one .apx file per order (default is False).
 
     Returns:
         None
@@ -308,41 +875,20 @@ def replay_debate_with_new_agents(debate_path: str, number_agents: int, csv_fold
         new_sub_folder = f"/{last_debate_name}-{new_val}"
         
     # Get UG from the debate to replay.   
-    UG = read_graph_from_apx(debate_path+"/universe_graph.apx")
+    UG = read_graph_from_apx(debate_path+"/universe_graph.apx", cache=True)
 
     # export UG as apx file in the replay path.
     export_apx(replays_folder+new_sub_folder, "universe_graph", UG)
 
+    # Reverse index of the universe graph, shared by the agents and the debates.
+    reverse_index = build_reverse_adjacency_list(UG)
+    cache = HbsCache()
+
     # Create a new agent list from the given UG.
-    agents = initialize_agents(UG, number_agents)
+    agents = initialize_agents(UG, number_agents, reverse_index)
     
     for i in range(len(agents)) :
         export_apx(replays_folder+new_sub_folder, f"opinion_graph_{i}", agents[i].OG)
-    
-    data = {"order":[], "Vp":[], "numberOfTurn":[]}
-
-    j = 0
-    for a in agents:
-        data[a.get_number()] = []
-        j += 1
-    
-    combinations = find_all_combinations(agents)
-    data_2 = {"order":[], "Vp":[], "numberOfTurn":[], "turnHistory":[]}
-
-    # Run the protocol for each agent order combination
-    for agent_order in combinations:
-        
-        vp, public_graph, order, agents, nb_turn = run_protocol(UG, agent_order)
-        
-        # Export results in apx and csv
-        export_apx(replays_folder+new_sub_folder, order, public_graph)
-        data = export_results(data, public_graph, order, vp, nb_turn, agents)
-        exported_data_2 = export_results_2(data_2, order, vp, nb_turn, agents)
-        for a in agent_order:
-            a.historical = dict()
-    
-    df = pd.DataFrame(data)
-    df2 = pd.DataFrame(exported_data_2)
 
     # Main csv folder which will contain every other csv folders
     if not os.path.exists(csv_folder):
@@ -356,9 +902,80 @@ def replay_debate_with_new_agents(debate_path: str, number_agents: int, csv_fold
     if not os.path.exists(csv_2_pathname):
         os.mkdir(csv_2_pathname)
 
-    df.to_csv(f"{csv_1_pathname}/{new_sub_folder}_data.csv", index=False)
-    df2.to_csv(f"{csv_2_pathname}/{new_sub_folder}_data_2.csv", index=False)
+    # Csv files, written as the orders are played.
+    with open_result_sink(f"{csv_1_pathname}/{new_sub_folder}_data.csv",
+                          f"{csv_2_pathname}/{new_sub_folder}_data_2.csv", agents, result_format) as sink, \
+         (PublicGraphArchive(replays_folder+new_sub_folder + "/public_graphs.json.gz") if pg_archive else nullcontext()) as archive:
+
+        # Run the protocol for each agent order combination
+        for vp, public_graph, order, agent_order, nb_turn in play_all_orders(UG, agents, workers, reverse_index, cache):
+            
+            # Export results in apx (or in the archive) and csv
+            if pg_archive:
+                archive.add(order, public_graph)
+            else:
+                export_apx(replays_folder+new_sub_folder, order, public_graph)
+            sink.add(public_graph, order, vp, nb_turn, agent_order)
     
+def sample_debate_with_new_agents(debate_path: str, number_agents: int, csv_folder="csv", half_width=0.01,
+                                  confidence=0.95, max_samples=100000, stratified=False, seed=None) -> dict:
+    """
+    Plays the debate with the given debate number with new agents on randomly drawn orders (see sample_protocols),
+    which makes debates with many agents (10 to 50) possible in bounded time.
+
+    Args:
+        debate_path (str): The path of the debate whose universe graph is used.
+        number_agents (int): The number of agents.
+        csv_folder (str): The folder where the csv files are written (default is "csv").
+        half_width (float): The requested half-width of the confidence interval of the mean of Vp (default is 0.01).
+        confidence (float): The confidence level of the interval (default is 0.95).
+        max_samples (int): The maximum number of orders to draw (default is 100000).
+        stratified (bool): Whether to stratify the orders by first speaker (default is False).
+        seed (int): The seed of the random generator (default is None).
+
+    Returns:
+        dict: The summary of the sampling (number of samples, mean, variance, achieved precision, position effects).
+    """
+
+    if not os.path.exists(debate_path):
+        print(f"The file {debate_path} does not exist.")
+        sys.exit(1)
+
+    UG = read_graph_from_apx(debate_path+"/universe_graph.apx", cache=True)
+    reverse_index = build_reverse_adjacency_list(UG)
+    cache = HbsCache()
+    agents = initialize_agents(UG, number_agents, reverse_index)
+
+    summary = {}
+
+    # Subfolders for csv_1, csv_2 and the sampling summaries
+    csv_1_pathname = csv_folder + "/sampled_csv_1"
+    csv_2_pathname = csv_folder + "/sampled_csv_2"
+    for folder in (csv_folder, csv_1_pathname, csv_2_pathname):
+        if not os.path.exists(folder):
+            os.mkdir(folder)
+
+    debate_name = debate_path.split("/")[len(debate_path.split("/"))-1]
+    k = 1
+    while os.path.exists(f"{csv_1_pathname}/{debate_name}-{number_agents}-{k}_data.csv"):
+        k += 1
+    file_name = f"{debate_name}-{number_agents}-{k}"
+
+    # Csv files, written as the orders are played.
+    with CSVResultSink(f"{csv_1_pathname}/{file_name}_data.csv", f"{csv_2_pathname}/{file_name}_data_2.csv", agents) as sink:
+
+        # Run the protocol for each drawn order
+        for vp, public_graph, order, agent_order, nb_turn in sample_protocols(UG, agents, summary, half_width, confidence,
+                                                                               max_samples=max_samples, stratified=stratified,
+                                                                               seed=seed, reverse_index=reverse_index, cache=cache):
+            sink.add(public_graph, order, vp, nb_turn, agent_order)
+
+    # Sample count and achieved precision, alongside the results.
+    summary_row = {key: [value] for key, value in summary.items()}
+    pd.DataFrame(summary_row).to_csv(f"{csv_1_pathname}/{file_name}_summary.csv", index=False)
+
+    return summary
+
 def replay_combination(debate_path: str, combination: str) -> None:
     """
     Replay a debate based on a specific combination of agents.
@@ -395,7 +1012,7 @@ def replay_combination(debate_path: str, combination: str) -> None:
         new_sub_folder = f"/{last_debate_name}.{new_val}"
 
     # Create the right subfolder where to put results    
-    UG = read_graph_from_apx(debate_path+"/universe_graph.apx")
+    UG = read_graph_from_apx(debate_path+"/universe_graph.apx", cache=True)
     csv_path = (debate_path+"/data.csv")
 
     # Open CSV file to get the right number of agents to replay the debate.
@@ -424,15 +1041,8 @@ def replay_combination(debate_path: str, combination: str) -> None:
     
     combinations = find_all_combinations(agents)
 
-    # Find the right combination to replay
-    agent_order = ""
-    for comb in combinations:
-        word = ""
-        for j in comb :
-            number=f"{j.get_number()}"
-            word += ","+number
-        if(word[1:len(word)]==combination):
-            agent_order = comb
+    # Find the right combination to replay, directly from its index.
+    agent_order = combinations[permutation_index([int(number) for number in combination.split(",")])]
     
     vp, public_graph, order, agents, nb_turn = run_protocol(UG, agent_order)
     data_2 = {"order":[], "Vp":[], "numberOfTurn":[], "turnHistory":[]}
@@ -468,28 +1078,9 @@ def export_results(data, public_graph, order, vp, nb_turn, agents) -> dict:
         - The historical data includes the agent's name, comfort zone status, and historical actions.
     """
 
-    data["order"].append(order)
-    data["Vp"].append(vp)
-    data["numberOfTurn"].append(nb_turn)
-
-    # Append historical data of each agent to data dictionary
-    for a in agents:
-        historical_data = []
-        historical_data.append(a.name)
-        historical_data.append(a.in_comfort_zone(public_graph))
-        historical_data.append(a.historical)
-        
-        
-        j=0
-        for i in a.historical.values() :
-            if i!=None :
-                j=j+1 
-        
-        historical_data.append(j)
-        historical_data.append(a.nbArg)
-        historical_data.append(a.nbAtt)
-        historical_data.append(a.get_distance(public_graph))
-        data[a.get_number()].append(historical_data)
+    row = result_row(public_graph, order, vp, nb_turn, agents)
+    for key, value in row.items():
+        data[key].append(value)
 
     return data
 
@@ -513,25 +1104,8 @@ def export_results_2(data, order, vp, nb_turn, agents) -> dict:
         - The turns are indexed starting from 0.
     """
 
-    data["order"].append(order)
-    data["Vp"].append(vp)
-    data["numberOfTurn"].append(nb_turn)
+    row = result_row_2(order, vp, nb_turn, agents)
+    for key, value in row.items():
+        data[key].append(value)
 
-    # Create a dictionary to store historical data for all turns
-    all_turn = dict()
-
-    for i in range(nb_turn):
-        turn = []
-        dic = dict()
-
-        # Gather historical data for each agent for the current turn
-        for a in agents:
-            dic[a.name] = a.historical[i+1]
-
-        turn.append(dic)
-        all_turn[f"turn {i}"] = turn
-
-    # Append turn history to data dictionary
-    data["turnHistory"].append(all_turn)
-
-    return data
\ No newline at end of file
+    return data
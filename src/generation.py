@@ -0,0 +1,312 @@
+# src/generation.py
+
+"""
+This Python script generates debate graphs with NumPy, as arrays of attacks built in a few vectorized passes,
+without networkx. The generation is seedable and scales to millions of arguments.
+
+Authors: Mohamed AZZAOUI, Nassim LATTAB
+Creation Date: 18/10/2026
+"""
+
+import numpy as np
+from src.util import nb_branch_star_min, nb_branch_star_max, nb_arg_tree_min, nb_arg_tree_max
+from src.graph import CSRGraph
+from src.IO_graph_apx import export_attacks_as_apx
+
+TOPOLOGIES = ("random", "chain", "bushy", "cyclic")
+
+def generate_debate_attacks(nb_branch_min=nb_branch_star_min, nb_branch_max=nb_branch_star_max,
+                            tree_size_min=nb_arg_tree_min, tree_size_max=nb_arg_tree_max, topology="random",
+                            cycle_ratio=0.1, seed=None) -> tuple:
+    """
+    Generates a debate graph shaped like the ones of util.debate_graph_generation: the issue "0" is attacked by
+    the root of each branch (1 to nb_branches), and each branch is a tree of attacks towards its root.
+
+    The shape of the trees depends on the topology:
+    - "random": each new argument attacks a uniformly chosen argument of its branch (random recursive tree),
+    - "chain": each new argument attacks the previous one, giving deep chains,
+    - "bushy": each new argument attacks an argument chosen with a strong bias towards the first ones of its
+      branch, giving shallow and wide trees,
+    - "cyclic": a "random" tree where cycle_ratio of the new arguments are also attacked by an earlier argument
+      of their branch, which closes a cycle whenever that argument is on their path to the root.
+
+    Args:
+        nb_branch_min (int): The minimum number of branches (default is util.nb_branch_star_min).
+        nb_branch_max (int): The maximum number of branches, included (default is util.nb_branch_star_max).
+        tree_size_min (int): The minimum number of arguments of a branch, at least 1 (default is util.nb_arg_tree_min).
+        tree_size_max (int): The maximum number of arguments of a branch, excluded (default is util.nb_arg_tree_max).
+        topology (str): The shape of the branches, in TOPOLOGIES (default is "random").
+        cycle_ratio (float): The share of arguments receiving an additional attack, for the "cyclic" topology
+        (default is 0.1).
+        seed (int): The seed of the random generator (default is None).
+
+    Returns:
+        tuple: (nb_arguments, attackers, attacked) where the arguments are the integers 0 to nb_arguments-1 and
+        attackers/attacked are int64 arrays of both ends of every attack, sorted by attacker then attacked.
+    """
+
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology {topology}, expected one of {', '.join(TOPOLOGIES)}.")
+    if tree_size_min < 1 or tree_size_max <= tree_size_min:
+        raise ValueError("The branches must have at least one argument (1 <= tree_size_min < tree_size_max).")
+
+    rng = np.random.default_rng(seed)
+
+    nb_branches = int(rng.integers(nb_branch_min, nb_branch_max + 1))
+    extra = rng.integers(tree_size_min, tree_size_max, size=nb_branches) - 1 # Arguments of each branch besides its root.
+    nb_extra = int(extra.sum())
+    nb_arguments = 1 + nb_branches + nb_extra
+
+    # The arguments of the k-th branch besides its root get consecutive ids, from first_ids[k].
+    starts = np.concatenate(([0], np.cumsum(extra)[:-1]))
+    first_ids = 1 + nb_branches + starts
+    branches = np.repeat(np.arange(nb_branches), extra)
+    ids = np.arange(1 + nb_branches, nb_arguments)
+    local = ids - first_ids[branches] + 1 # Position in the branch, the root being 0.
+
+    # Position in the branch of the argument each new argument attacks.
+    if topology == "chain":
+        targets = local - 1
+    elif topology == "bushy":
+        targets = np.floor(rng.random(nb_extra)**3 * local).astype(np.int64)
+    else:
+        targets = np.floor(rng.random(nb_extra) * local).astype(np.int64)
+
+    def to_ids(positions, branch_of):
+        return np.where(positions == 0, branch_of + 1, first_ids[branch_of] + positions - 1)
+
+    attackers = [np.arange(1, nb_branches + 1), ids]
+    attacked = [np.zeros(nb_branches, dtype=np.int64), to_ids(targets, branches)]
+
+    if topology == "cyclic" and nb_extra > 0:
+        chosen = rng.choice(nb_extra, size=int(np.ceil(cycle_ratio * nb_extra)), replace=False)
+        sources = np.floor(rng.random(len(chosen)) * local[chosen]).astype(np.int64)
+        attackers.append(to_ids(sources, branches[chosen]))
+        attacked.append(ids[chosen])
+
+    attackers = np.concatenate(attackers).astype(np.int64)
+    attacked = np.concatenate(attacked).astype(np.int64)
+
+    # In a tree every argument but the issue attacks exactly one argument, by increasing id: already sorted.
+    if topology != "cyclic":
+        return nb_arguments, attackers, attacked
+
+    # Sort by attacker then attacked, removing duplicated attacks.
+    keys = np.sort(attackers * nb_arguments + attacked)
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+    return nb_arguments, keys // nb_arguments, keys % nb_arguments
+
+def attacks_to_graph(nb_arguments: int, attackers, attacked, output="dict"):
+    """
+    Builds the graph of the given attacks, the arguments being labeled "0" to str(nb_arguments-1).
+
+    Args:
+        nb_arguments (int): The number of arguments.
+        attackers (array): The attacking argument of each attack.
+        attacked (array): The attacked argument of each attack.
+        output (str): "dict" (default) for a dictionary, "csr" for a CSRGraph.
+
+    Returns:
+        dict | CSRGraph: The graph, the attackers of each argument being in increasing order of id.
+    """
+
+    order = np.lexsort((attackers, attacked))
+    indices = attackers[order].astype(np.intc)
+    indptr = np.zeros(nb_arguments + 1, dtype=np.intc)
+    np.cumsum(np.bincount(attacked, minlength=nb_arguments), out=indptr[1:])
+    labels = [str(i) for i in range(nb_arguments)]
+
+    if output == "csr":
+        return CSRGraph(labels, indptr.tobytes(), indices.tobytes())
+
+    if output == "dict":
+        names = [labels[j] for j in indices.tolist()]
+        bounds = indptr.tolist()
+        return {k: names[bounds[i]:bounds[i+1]] for i, k in enumerate(labels)}
+
+    raise ValueError(f"Unknown output {output}, expected 'dict' or 'csr'.")
+
+def generate_debate_graph(output="dict", apx_path=None, **parameters):
+    """
+    Generates a debate graph (see generate_debate_attacks for the parameters), and returns it and/or streams it
+    to an .apx file.
+
+    Args:
+        output (str): "dict" (default), "csr" or None to only write the .apx file.
+        apx_path (str): The path of an .apx file where the graph is written (default is None).
+        **parameters: The parameters of generate_debate_attacks (branches, tree sizes, topology, seed...).
+
+    Returns:
+        dict | CSRGraph | None: The graph, unless output is None.
+    """
+
+    nb_arguments, attackers, attacked = generate_debate_attacks(**parameters)
+
+    if apx_path is not None:
+        export_attacks_as_apx(apx_path, nb_arguments, attackers, attacked)
+
+    if output is None:
+        return None
+
+    return attacks_to_graph(nb_arguments, attackers, attacked, output)
+
+def graph_arrays(UG) -> tuple:
+    """
+    Returns the labels and the arrays of attacks of a universe graph given as a dictionary or as a CSRGraph.
+
+    Returns:
+        tuple: (labels, attackers, attacked), the ends of each attack being ids in labels.
+    """
+
+    if isinstance(UG, CSRGraph):
+        indptr = np.frombuffer(UG.indptr, dtype=np.intc)
+        attackers = np.frombuffer(UG.indices, dtype=np.intc).astype(np.int64)
+        attacked = np.repeat(np.arange(len(UG.labels)), np.diff(indptr))
+        return UG.labels, attackers, attacked
+
+    labels = list(UG.keys())
+    index = {k: i for i, k in enumerate(labels)}
+    attackers = np.array([index[j] for value in UG.values() for j in value], dtype=np.int64)
+    attacked = np.repeat(np.arange(len(labels)), [len(value) for value in UG.values()])
+
+    return labels, attackers, attacked
+
+def topological_levels(nb_arguments: int, attackers, attacked) -> list | None:
+    """
+    Returns the arguments grouped by level, every argument coming in a later level than all of its attackers
+    (Kahn's algorithm, as util.topological_order), or None if the attacks contain a cycle.
+
+    Returns:
+        list | None: The int64 arrays of ids of each level, leaves first.
+    """
+
+    targets = [[] for _ in range(nb_arguments)]
+    for j, i in zip(attackers.tolist(), attacked.tolist()):
+        targets[j].append(i)
+    remaining = np.bincount(attacked, minlength=nb_arguments).tolist()
+
+    levels = []
+    current = [i for i in range(nb_arguments) if remaining[i] == 0]
+    count = 0
+    while current:
+        levels.append(np.array(current, dtype=np.int64))
+        count += len(current)
+        following = []
+        for j in current:
+            for i in targets[j]:
+                remaining[i] -= 1
+                if remaining[i] == 0:
+                    following.append(i)
+        current = following
+
+    return levels if count == nb_arguments else None
+
+def generate_opinion_graphs(UG, number_of_agents: int, seed=None, output="dict", chunk_size=None, with_Vk=False,
+                            tol=10**(-5), max_iter=10000) -> tuple:
+    """
+    Generates the opinion graphs of many agents at once, like util.auto_generate_OG: each agent knows the issue
+    and a uniformly drawn set of k other arguments, k being drawn uniformly between a quarter and all of them.
+
+    The sets are drawn as a boolean matrix (one row per agent, one column per argument of UG), by chunks of agents
+    to bound memory, and the number of attacks inside each OG is computed on the matrix with a sparse attack matrix
+    of UG. Only the final dictionaries are built argument by argument, which dominates the run time on large
+    graphs: analyses of large populations can keep the matrix instead (output=None).
+
+    With with_Vk, the values of the issue in all the OGs of a chunk are also computed on the matrix: level by level
+    in topological order when UG is acyclic (exact, as util.Hbs), else by the fixed-point iteration of
+    hbs_batch.Hbs_batch_iterate, stopped after max_iter sweeps. They are meant for analyses of the population:
+    the agents compute their own Vk with util.opinion_value, like in every other driver (see game.initialize_agents),
+    so the pass is skipped by default.
+
+    Args:
+        UG (dict | CSRGraph): The universe graph.
+        number_of_agents (int): The number of opinion graphs to generate.
+        seed (int): The seed of the random generator (default is None).
+        output (str): "dict" (default) for the OGs as dictionaries, None for the boolean matrix of their arguments.
+        chunk_size (int): The number of agents per chunk (default is None, about 1e7 matrix cells per chunk).
+        with_Vk (bool): Whether to compute the value of the issue (h-categorizer) in each OG (default is False).
+        tol (float): The convergence threshold of the values on cyclic graphs (default is 1e-5).
+        max_iter (int): The maximum number of sweeps of the iteration on cyclic graphs (default is 10000).
+
+    Returns:
+        tuple: (OGs, nbAtts, Vks), the opinion graphs as dictionaries (arguments in the order of UG, sorted
+        attackers) or as a number_of_agents x len(UG) boolean matrix over the arguments of UG, the number of
+        attacks of each one, and the value of the issue in each one (None without with_Vk). The values match
+        util.Hbs up to rounding, and within tol on cyclic graphs.
+    """
+
+    if output not in ("dict", None):
+        raise ValueError(f"Unknown output {output}, expected 'dict' or None.")
+
+    import scipy.sparse as sp
+    from src.hbs_batch import Hbs_batch_iterate
+
+    rng = np.random.default_rng(seed)
+    labels, attackers, attacked = graph_arrays(UG)
+    n = len(labels)
+    issue = labels.index("0")
+    m = n - 1 # Arguments besides the issue.
+
+    # Row : attacked argument, column : attacking argument.
+    A = sp.csr_matrix((np.ones(len(attackers)), (attacked, attackers)), shape=(n, n))
+    if with_Vk:
+        levels = topological_levels(n, attackers, attacked)
+        if levels is not None:
+            level_attacks = [A[level] for level in levels]
+
+    # Attacks sorted by attacked argument then by label of the attacker, like generate_subgraph.
+    rank = np.empty(n, dtype=np.int64)
+    rank[sorted(range(n), key=labels.__getitem__)] = np.arange(n)
+    order = np.lexsort((rank[attackers], attacked))
+    attackers, attacked = attackers[order], attacked[order]
+
+    if chunk_size is None:
+        chunk_size = max(1, 10**7 // max(n, 1))
+
+    OGs, nbAtts = [], []
+    Vks = [] if with_Vk else None
+
+    for start in range(0, number_of_agents, chunk_size):
+        c = min(chunk_size, number_of_agents - start)
+
+        # Each row keeps its k first arguments in a random order.
+        k = rng.integers(m // 4, m + 1, size=c)
+        shuffled = np.argsort(rng.random((c, m)), axis=1)
+        selected = np.zeros((c, m), dtype=bool)
+        np.put_along_axis(selected, shuffled, np.arange(m)[None, :] < k[:, None], axis=1)
+
+        M = np.insert(selected, issue, True, axis=1)
+
+        # Attacks between two arguments of the OG.
+        MT = M.T.astype(np.float64)
+        nbAtts.extend(np.rint(((A @ MT) * MT).sum(axis=0)).astype(int).tolist())
+
+        # Values of every argument of every OG of the chunk, 0 for the arguments out of an OG so that they
+        # do not count as attackers.
+        if with_Vk:
+            if levels is not None:
+                values = np.zeros((n, c))
+                for level, attacks in zip(levels, level_attacks):
+                    values[level] = MT[level] / (1 + attacks @ values)
+            else:
+                values = Hbs_batch_iterate(A, MT, tol, max_iter)
+            Vks.extend(values[issue].tolist())
+
+        if output is None:
+            OGs.append(M)
+            continue
+
+        # Dictionaries of the OGs.
+        for row in M:
+            keep = row[attackers] & row[attacked]
+            kept_attacked = attacked[keep]
+            names = [labels[j] for j in attackers[keep].tolist()]
+            ids = np.flatnonzero(row)
+            bounds = np.searchsorted(kept_attacked, np.append(ids, n)).tolist()
+            OGs.append({labels[i]: names[bounds[p]:bounds[p+1]] for p, i in enumerate(ids.tolist())})
+
+    if output is None:
+        OGs = np.concatenate(OGs) if OGs else np.zeros((0, n), dtype=bool)
+
+    return OGs, nbAtts, Vks
@@ -0,0 +1,285 @@
+# src/graph.py
+
+"""
+This Python script contains a compact graph representation, where the arguments of a universe graph are
+mapped once to dense integers and the attacks are stored as compressed sparse row (CSR) arrays.
+
+The representation is opt-in: the drivers of game.py and the public graphs of DebateState are dictionaries.
+A CSRGraph behaves like a dictionary graph, so it can be given as the universe graph of the agents, of
+DebateState and of the functions of util.py, e.g. CSRGraph.from_apx for large universe graphs.
+
+Authors: Mohamed AZZAOUI, Nassim LATTAB
+Creation Date: 18/10/2026
+"""
+
+from array import array
+
+def mask_of_ids(ids, size: int) -> int:
+    """
+    Returns the bitset (a Python integer whose bit i is set for each id i) of a collection of argument ids.
+
+    Args:
+        ids (iterable): The ids, all lower than size.
+        size (int): The number of arguments of the universe graph.
+    """
+
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+
+    return int.from_bytes(bits, 'little')
+
+# Represents a debate graph (UG, or a subgraph of it such as an OG or a PG) with integer-indexed arguments.
+class CSRGraph :
+
+    def __init__(self, labels: list, indptr, indices, ids=None, universe=None):
+        """
+        Initializes the graph from its CSR arrays. Use from_dict, from_apx or subgraph rather than this constructor.
+
+        Args:
+            labels (list): The arguments of the graph, in order.
+            indptr (array): The attackers of the k-th argument are indices[indptr[k]:indptr[k+1]].
+            indices (array): The ids (in the universe graph) of the attackers.
+            ids (array): The ids of the arguments in the universe graph (default is None, the graph is a universe graph).
+            universe (CSRGraph): The universe graph the ids refer to (default is None, the graph itself).
+        """
+
+        self.labels = list(labels)
+        self.indptr = array('i', indptr)
+        self.indices = array('i', indices)
+        self.universe = self if universe is None else universe
+
+        if universe is None:
+            self.ids = array('i', range(len(self.labels)))
+            self.index = {k: i for i, k in enumerate(self.labels)} # Label -> id, shared with the subgraphs.
+            self.positions = None
+            self.reverse_indptr = None
+            self.reverse_indices = None
+            self.rank = None
+        else:
+            self.ids = array('i', ids)
+            self.index = universe.index
+            self.positions = {j: i for i, j in enumerate(self.ids)} # Id -> position in the subgraph, and membership.
+        self.mask = None # Bitset of the arguments over the ids of UG, built by get_mask when first needed.
+
+    @classmethod
+    def from_dict(cls, graph: dict):
+        """
+        Returns the universe graph built from a graph represented as a dictionary.
+
+        Args:
+            graph (dict): Key : attacked argument, Value : list of attacking arguments.
+        """
+
+        index = {k: i for i, k in enumerate(graph.keys())}
+        indptr = array('i', [0])
+        indices = array('i')
+        for value in graph.values():
+            indices.extend(index[j] for j in value)
+            indptr.append(len(indices))
+
+        return cls(list(graph.keys()), indptr, indices)
+
+    @classmethod
+    def from_apx(cls, file_path: str, cache=False):
+        """
+        Returns the universe graph read from an .apx file (see IO_graph_apx.read_apx_arrays).
+        """
+
+        from src.IO_graph_apx import read_apx_arrays, parse_apx
+
+        labels, indptr, indices = read_apx_arrays(file_path) if cache else parse_apx(file_path)
+        return cls(labels, indptr.tolist(), indices.tolist())
+
+    def to_dict(self) -> dict:
+        """
+        Returns the graph represented as a dictionary (Key : attacked argument, Value : list of attacking arguments),
+        e.g. to export it with IO_graph_apx.export_apx.
+        """
+
+        labels = self.universe.labels
+        return {k: [labels[j] for j in self.indices[self.indptr[i]:self.indptr[i+1]]] for i, k in enumerate(self.labels)}
+
+    def is_universe(self) -> bool:
+        return self.universe is self
+
+    def contains_id(self, argument_id: int) -> bool:
+        """
+        Returns whether the argument of the given id (in the universe graph) belongs to the graph.
+        """
+
+        if self.positions is None:
+            return 0 <= argument_id < len(self.labels)
+        return argument_id in self.positions
+
+    def get_mask(self) -> int:
+        """
+        Returns the bitset of the arguments of the graph over the ids of the universe graph (see mask_of_ids),
+        built on the first call, e.g. to intersect or compare the arguments of several subgraphs at once.
+        """
+
+        if self.mask is None:
+            self.mask = mask_of_ids(self.ids, len(self.universe.labels))
+
+        return self.mask
+
+    def position(self, argument_id: int) -> int:
+        """
+        Returns the position in the graph of the argument of the given id.
+        """
+
+        return argument_id if self.positions is None else self.positions[argument_id]
+
+    def attacker_ids(self, k: int) -> array:
+        """
+        Returns the ids of the attackers of the k-th argument of the graph.
+        """
+
+        return self.indices[self.indptr[k]:self.indptr[k+1]]
+
+    def target_ids(self, argument_id: int) -> array:
+        """
+        Returns the ids of the arguments attacked by the argument of the given id in the universe graph,
+        in the order of the universe graph.
+        """
+
+        universe = self.universe
+        if universe.reverse_indptr is None:
+            counts = [0] * (len(universe.labels) + 1)
+            for j in universe.indices:
+                counts[j+1] += 1
+            for i in range(len(universe.labels)):
+                counts[i+1] += counts[i]
+
+            # Filling the attacked arguments in order keeps every list in the order of the universe graph.
+            reverse_indices = array('i', bytes(4 * len(universe.indices)))
+            fill = counts[:-1]
+            for i in range(len(universe.labels)):
+                for j in universe.attacker_ids(i):
+                    reverse_indices[fill[j]] = i
+                    fill[j] += 1
+
+            universe.reverse_indptr = array('i', counts)
+            universe.reverse_indices = reverse_indices
+
+        return universe.reverse_indices[universe.reverse_indptr[argument_id]:universe.reverse_indptr[argument_id+1]]
+
+    def label_rank(self, argument_id: int) -> int:
+        """
+        Returns the rank of the label of an argument among the sorted labels of the universe graph,
+        used to sort attackers like generate_subgraph does.
+        """
+
+        universe = self.universe
+        if universe.rank is None:
+            universe.rank = array('i', bytes(4 * len(universe.labels)))
+            for r, i in enumerate(sorted(range(len(universe.labels)), key=universe.labels.__getitem__)):
+                universe.rank[i] = r
+
+        return universe.rank[argument_id]
+
+    def subgraph(self, arguments):
+        """
+        Returns the subgraph of the universe graph composed of the given arguments, like util.generate_subgraph:
+        the arguments are kept in the given order (an argument given twice is kept once, at its first place) and
+        the attackers of each argument are sorted.
+
+        Args:
+            arguments (list): The labels of the arguments.
+
+        Returns:
+            CSRGraph: The subgraph, sharing the ids of the universe graph.
+        """
+
+        universe = self.universe
+        ids = array('i', (universe.index[a] for a in dict.fromkeys(arguments)))
+        members = set(ids)
+
+        indptr = array('i', [0])
+        indices = array('i')
+        for i in ids:
+            attackers = [j for j in universe.attacker_ids(i) if j in members]
+            attackers.sort(key=self.label_rank)
+            indices.extend(attackers)
+            indptr.append(len(indices))
+
+        return CSRGraph([universe.labels[i] for i in ids], indptr, indices, ids, universe)
+
+    def hbs_values(self) -> list:
+        """
+        Returns the harmony score of every argument of the graph, in order. Acyclic graphs are evaluated in one
+        topological pass on the positions, cyclic ones by util.Hbs_iterative.
+        """
+
+        n = len(self.labels)
+        attackers = [[self.position(j) for j in self.attacker_ids(k)] for k in range(n)]
+
+        # Kahn's algorithm on the positions.
+        remaining = [len(a) for a in attackers]
+        attacked = [[] for _ in range(n)]
+        for k in range(n):
+            for j in attackers[k]:
+                attacked[j].append(k)
+
+        order = [k for k in range(n) if remaining[k] == 0]
+        i = 0
+        while i < len(order):
+            for k in attacked[order[i]]:
+                remaining[k] -= 1
+                if remaining[k] == 0:
+                    order.append(k)
+            i += 1
+
+        values = [1.0] * n
+
+        if len(order) == n:
+            for k in order:
+                sum = 0
+                for j in attackers[k]:
+                    sum += values[j]
+                values[k] = 1 / (1 + sum)
+            return values
+
+        from src.util import Hbs_iterative
+
+        values = Hbs_iterative(self)
+        return [values[k] for k in self.labels]
+
+    # Dictionary-like access by label, so that a CSRGraph can be used where a dict graph is expected.
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __contains__(self, argument) -> bool:
+        argument_id = self.index.get(argument)
+        return argument_id is not None and self.contains_id(argument_id)
+
+    def __getitem__(self, argument) -> list:
+        argument_id = self.index[argument]
+        if not self.contains_id(argument_id):
+            raise KeyError(argument)
+        labels = self.universe.labels
+        return [labels[j] for j in self.attacker_ids(self.position(argument_id))]
+
+    def keys(self) -> list:
+        return self.labels
+
+    def values(self) -> list:
+        labels = self.universe.labels
+        return [[labels[j] for j in self.attacker_ids(k)] for k in range(len(self.labels))]
+
+    def items(self) -> list:
+        return list(zip(self.labels, self.values()))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CSRGraph):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CSRGraph({self.to_dict()})"
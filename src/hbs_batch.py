@@ -0,0 +1,120 @@
+# src/hbs_batch.py
+
+"""
+This Python script evaluates the Harmony-based System (Hbs) of many independent graphs at once.
+The graphs are packed into one block-diagonal sparse attack matrix and iterated with NumPy/SciPy.
+
+Authors: Mohamed AZZAOUI, Nassim LATTAB
+Creation Date: 18/10/2026
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+def pack_graphs(graphs: list) -> tuple:
+    """
+    Packs a list of graphs into compact arrays indexed by global argument ids.
+
+    Args:
+        graphs (list): The graphs represented as dictionaries.
+        Keys represent arguments, and values represent lists of attacking arguments.
+
+    Returns:
+        tuple: (offsets, attacked, attackers, labels) where offsets[g] is the global id of the first argument of
+        the g-th graph (offsets[-1] is the total number of arguments), attacked/attackers are the global ids of
+        both ends of every attack and labels[g] maps the arguments of the g-th graph to their local id.
+    """
+
+    offsets = [0]
+    attacked = []
+    attackers = []
+    labels = []
+
+    for graph in graphs:
+        offset = offsets[-1]
+        index = {k: i for i, k in enumerate(graph.keys())}
+
+        for key, value in graph.items():
+            for j in value:
+                attacked.append(offset + index[key])
+                attackers.append(offset + index[j])
+
+        offsets.append(offset + len(index))
+        labels.append(index)
+
+    return (np.array(offsets, dtype=np.int64), np.array(attacked, dtype=np.int64),
+            np.array(attackers, dtype=np.int64), labels)
+
+def Hbs_batch_iterate(A, members, tol=10**(-5), max_iter=10000):
+    """
+    Iterates the harmony scores of a batch of graphs sharing a sparse attack matrix: v = m / (1 + A.v), starting
+    from v = m, where m is 1 for the arguments of a graph and 0 for the others (so that they do not count as
+    attackers). Every column of members is a graph when it is a matrix. The iteration stops when every argument
+    moves less than the threshold, like util.Hbs_iterative, or after max_iter iterations. Acyclic graphs are
+    exact after (depth + 1) iterations.
+
+    Args:
+        A (scipy.sparse matrix): The attacks (row : attacked argument, column : attacking argument).
+        members (numpy.ndarray): The membership of each argument (one row per argument, one column per graph
+        when it is a matrix), as floats.
+        tol (float): The convergence threshold (default is 1e-5).
+        max_iter (int): The maximum number of iterations (default is 10000).
+
+    Returns:
+        numpy.ndarray: The harmony score of each argument (in each graph), 0 out of the graphs.
+    """
+
+    values = members
+    for _ in range(max_iter):
+        new_values = members / (1 + A @ values)
+        converged = new_values.size == 0 or np.max(np.abs(new_values - values)) <= tol
+        values = new_values
+        if converged:
+            break
+
+    return values
+
+def Hbs_batch_arrays(nb_args: int, attacked, attackers, tol=10**(-5), max_iter=10000):
+    """
+    Computes the harmony score of every argument of a block-diagonal graph given as arrays of attacks
+    (see Hbs_batch_iterate).
+
+    Args:
+        nb_args (int): The total number of arguments.
+        attacked (array): The global id of the attacked argument of each attack.
+        attackers (array): The global id of the attacking argument of each attack.
+        tol (float): The convergence threshold (default is 1e-5).
+        max_iter (int): The maximum number of iterations (default is 10000).
+
+    Returns:
+        numpy.ndarray: The harmony score of each argument.
+    """
+
+    # Row : attacked argument, column : attacking argument.
+    A = sp.csr_matrix((np.ones(len(attacked)), (attacked, attackers)), shape=(nb_args, nb_args))
+
+    return Hbs_batch_iterate(A, np.ones(nb_args), tol, max_iter)
+
+def Hbs_batch(graphs: list, argument: str | None = "0", tol=10**(-5), max_iter=10000) -> list:
+    """
+    Computes the harmony score of the same argument (the issue by default) in every graph of the list, or of
+    every argument when argument is None. Gives the same results as util.Hbs within its convergence threshold.
+
+    Args:
+        graphs (list): The graphs represented as dictionaries.
+        argument (str): The argument for which the harmony score is to be computed (default is the issue "0"),
+        None for all of them.
+        tol (float): The convergence threshold (default is 1e-5).
+        max_iter (int): The maximum number of iterations (default is 10000).
+
+    Returns:
+        list: The harmony score of the argument in each graph, or one dictionary of harmony scores per graph.
+    """
+
+    offsets, attacked, attackers, labels = pack_graphs(graphs)
+    values = Hbs_batch_arrays(int(offsets[-1]), attacked, attackers, tol, max_iter)
+
+    if argument is None:
+        return [{k: float(values[offsets[g] + i]) for k, i in index.items()} for g, index in enumerate(labels)]
+
+    return [float(values[offsets[g] + index[argument]]) for g, index in enumerate(labels)]
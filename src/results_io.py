@@ -0,0 +1,294 @@
+# src/results_io.py
+
+"""
+This Python script contains the rows exported for each agent order of a debate, and the sinks writing them
+to files as the orders are played.
+
+Authors: Mohamed AZZAOUI, Nassim LATTAB
+Creation Date: 18/10/2026
+"""
+
+import csv, os
+from array import array
+import numpy as np
+
+def result_row(public_graph, order, vp, nb_turn, agents) -> dict:
+    """
+    Returns the row of the first csv file for one order: order, Vp, number of turns, and for each agent
+    [name, in comfort zone, historical, number of arguments played, nbArg, nbAtt, distance].
+
+    Parameters:
+        public_graph (dict): The public opinion graph after the debate.
+        order (str): The order in which the agents participated in the debate.
+        vp (float): The final value of the issue.
+        nb_turn (int): The total number of turns in the debate.
+        agents (List[Agent]): A list of Agent objects representing participants in the debate.
+
+    Returns:
+        dict: The row, with one column per agent number.
+    """
+
+    row = {"order": order, "Vp": vp, "numberOfTurn": nb_turn}
+
+    for a in agents:
+        historical_data = []
+        historical_data.append(a.name)
+        historical_data.append(a.in_comfort_zone(vp))
+        historical_data.append(a.historical)
+
+        j=0
+        for i in a.historical.values() :
+            if i!=None :
+                j=j+1
+
+        historical_data.append(j)
+        historical_data.append(a.nbArg)
+        historical_data.append(a.nbAtt)
+        historical_data.append(a.get_distance(vp))
+        row[a.get_number()] = historical_data
+
+    return row
+
+def result_row_2(order, vp, nb_turn, agents) -> dict:
+    """
+    Returns the row of the second csv file for one order: order, Vp, number of turns and the move of every
+    agent at each turn (turns indexed from 0).
+
+    Parameters:
+        order (str): The order in which the agents participated in the debate.
+        vp (float): The final value of the issue.
+        nb_turn (int): The total number of turns in the debate.
+        agents (List[Agent]): A list of Agent objects representing participants in the debate.
+
+    Returns:
+        dict: The row.
+    """
+
+    # Create a dictionary to store historical data for all turns
+    all_turn = dict()
+
+    for i in range(nb_turn):
+        turn = []
+        dic = dict()
+
+        # Gather historical data for each agent for the current turn
+        for a in agents:
+            dic[a.name] = a.historical[i+1]
+
+        turn.append(dic)
+        all_turn[f"turn {i}"] = turn
+
+    return {"order": order, "Vp": vp, "numberOfTurn": nb_turn, "turnHistory": all_turn}
+
+# Writes the rows of a csv file by chunks, as they are produced.
+class CSVWriter :
+
+    def __init__(self, path: str, columns: list, chunk_size=1000):
+        """
+        Creates the file and writes its header (same layout as pandas.DataFrame.to_csv with index=False).
+
+        Args:
+            path (str): The path of the csv file.
+            columns (list): The columns of the file.
+            chunk_size (int): The number of rows kept in memory before being written (default is 1000).
+        """
+
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.rows = []
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file, lineterminator=os.linesep)
+        self.writer.writerow(columns)
+
+    def write(self, row: dict) -> None:
+        """
+        Adds a row. Its values are formatted right away, so that later changes of the objects do not alter it.
+        """
+
+        self.rows.append([str(row[column]) for column in self.columns])
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the rows kept in memory to the file.
+        """
+
+        self.writer.writerows(self.rows)
+        self.rows = []
+        self.file.flush()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+# Streams the results of the orders of a debate into the two csv files, with bounded memory.
+class CSVResultSink :
+
+    def __init__(self, path_1: str, path_2: str, agents: list, chunk_size=1000):
+        """
+        Opens the two csv files of a debate.
+
+        The rows are written in chunks of chunk_size orders as they finish, so memory stays flat whatever
+        the number of orders. When used in a with statement, the rows already played are flushed even if
+        the run is interrupted, leaving a valid partial result.
+
+        Args:
+            path_1 (str): The path of the csv file with one column per agent.
+            path_2 (str): The path of the csv file with the turn history.
+            agents (list): The agents of the debate (one column each in the first file).
+            chunk_size (int): The number of orders kept in memory before being written (default is 1000).
+        """
+
+        columns_1 = ["order", "Vp", "numberOfTurn"] + [a.get_number() for a in agents]
+        columns_2 = ["order", "Vp", "numberOfTurn", "turnHistory"]
+        self.writer_1 = CSVWriter(path_1, columns_1, chunk_size)
+        self.writer_2 = CSVWriter(path_2, columns_2, chunk_size)
+
+    def add(self, public_graph, order, vp, nb_turn, agents) -> None:
+        """
+        Adds the results of one order (same parameters as game.export_results).
+        """
+
+        self.writer_1.write(result_row(public_graph, order, vp, nb_turn, agents))
+        self.writer_2.write(result_row_2(order, vp, nb_turn, agents))
+
+    def close(self) -> None:
+        self.writer_1.close()
+        self.writer_2.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+# Collects the results of the orders of a debate into typed columns, saved as a NumPy .npz archive.
+class NPZResultSink :
+
+    def __init__(self, path: str, agents: list):
+        """
+        Prepares the typed columns of a debate, to be saved in path when the sink is closed.
+
+        The archive holds one column per field and per agent instead of stringified lists, so that analyses
+        load only the columns they need without parsing:
+        - order (n_orders x n_agents int array of agent numbers), Vp (float), numberOfTurn (int),
+        - agent_<k>_in_comfort_zone (bool), agent_<k>_nb_played, agent_<k>_nbArg, agent_<k>_nbAtt (int),
+          agent_<k>_distance (float) for each agent number k,
+        - turns_order, turns_turn, turns_agent (int) and turns_argument (str, "" when the agent plays nothing):
+          the turn history in long format, one row per order, turn (from 1) and agent.
+        When used in a with statement, the orders already played are saved even if the run is interrupted.
+
+        Args:
+            path (str): The path of the .npz file.
+            agents (list): The agents of the debate.
+        """
+
+        self.path = path
+        self.numbers = [a.get_number() for a in agents]
+        self.orders = array('i')
+        self.Vp = array('d')
+        self.nb_turns = array('i')
+        self.in_comfort_zone = {k: array('b') for k in self.numbers}
+        self.nb_played = {k: array('i') for k in self.numbers}
+        self.nbArg = {k: array('i') for k in self.numbers}
+        self.nbAtt = {k: array('i') for k in self.numbers}
+        self.distance = {k: array('d') for k in self.numbers}
+        self.turns_order = array('i')
+        self.turns_turn = array('i')
+        self.turns_agent = array('i')
+        self.turns_argument = []
+        self.closed = False
+
+    def add(self, public_graph, order, vp, nb_turn, agents) -> None:
+        """
+        Adds the results of one order (same parameters as game.export_results).
+        """
+
+        order_id = len(self.Vp)
+        self.Vp.append(vp)
+        self.nb_turns.append(nb_turn)
+
+        for a in agents:
+            k = a.get_number()
+            self.orders.append(k)
+            self.in_comfort_zone[k].append(a.in_comfort_zone(vp))
+            self.nb_played[k].append(sum(1 for i in a.historical.values() if i != None))
+            self.nbArg[k].append(a.nbArg)
+            self.nbAtt[k].append(a.nbAtt)
+            self.distance[k].append(a.get_distance(vp))
+
+        for turn in range(1, nb_turn+1):
+            for a in agents:
+                argument = a.historical[turn]
+                self.turns_order.append(order_id)
+                self.turns_turn.append(turn)
+                self.turns_agent.append(a.get_number())
+                self.turns_argument.append("" if argument == None else str(argument))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        columns = {"order": np.array(self.orders, dtype=np.int32).reshape(-1, len(self.numbers)),
+                   "Vp": np.array(self.Vp, dtype=np.float64),
+                   "numberOfTurn": np.array(self.nb_turns, dtype=np.int32)}
+
+        for k in self.numbers:
+            columns[f"agent_{k}_in_comfort_zone"] = np.array(self.in_comfort_zone[k], dtype=bool)
+            columns[f"agent_{k}_nb_played"] = np.array(self.nb_played[k], dtype=np.int32)
+            columns[f"agent_{k}_nbArg"] = np.array(self.nbArg[k], dtype=np.int32)
+            columns[f"agent_{k}_nbAtt"] = np.array(self.nbAtt[k], dtype=np.int32)
+            columns[f"agent_{k}_distance"] = np.array(self.distance[k], dtype=np.float64)
+
+        columns["turns_order"] = np.array(self.turns_order, dtype=np.int32)
+        columns["turns_turn"] = np.array(self.turns_turn, dtype=np.int32)
+        columns["turns_agent"] = np.array(self.turns_agent, dtype=np.int32)
+        columns["turns_argument"] = np.array(self.turns_argument, dtype=str)
+
+        np.savez_compressed(self.path, **columns)
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def open_result_sink(path_1: str, path_2: str, agents: list, result_format="csv"):
+    """
+    Returns the sink writing the results of a debate in the given format.
+
+    Args:
+        path_1 (str): The path of the first csv file (its extension becomes .npz for the npz format).
+        path_2 (str): The path of the second csv file (unused for the npz format, which holds both tables).
+        agents (list): The agents of the debate.
+        result_format (str): "csv" (default) or "npz".
+
+    Returns:
+        CSVResultSink | NPZResultSink: The sink.
+    """
+
+    if result_format == "csv":
+        return CSVResultSink(path_1, path_2, agents)
+
+    if result_format == "npz":
+        return NPZResultSink(os.path.splitext(path_1)[0] + ".npz", agents)
+
+    raise ValueError(f"Unknown result format {result_format}, expected 'csv' or 'npz'.")
+
+def load_results(path: str) -> dict:
+    """
+    Opens a results archive written by NPZResultSink. Columns are only read when accessed.
+
+    Args:
+        path (str): The path of the .npz file.
+
+    Returns:
+        numpy.lib.npyio.NpzFile: A mapping from column names to arrays.
+    """
+
+    return np.load(path)
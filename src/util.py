@@ -8,20 +8,32 @@ Creation Date: 19/03/2024
 """
 
 from itertools import permutations
+from math import factorial
+from collections import OrderedDict
+from src.graph import CSRGraph
 
-def build_attackers_adjacency_list(OG, UG) -> dict:
+def build_attackers_adjacency_list(OG, UG, reverse_index=None) -> dict:
     """
     Builds and returns the adjacency list of attackers for arguments in OG based on UG.
 
     Args:
         OG (dict): The subgraph represented as a dictionary.
-        UG (dict): The universe graph represented as a dictionary.
+        UG (dict | CSRGraph): The universe graph represented as a dictionary or as a CSRGraph.
+        reverse_index (dict): The reverse adjacency list of UG (see build_reverse_adjacency_list), built once and
+        shared by all the agents of a debate (default is None, UG is scanned for every argument of OG).
 
     Returns:
         dict: The adjacency list of attackers for arguments in OG.
         Key : attacking argument, Value : list of attacked arguments (may be empty).
     """
 
+    # The reverse index lists the attacked arguments in the order of UG, like the scan below.
+    if reverse_index is not None:
+        return {OG_key: list(reverse_index[OG_key]) for OG_key in OG.keys()}
+
+    if isinstance(UG, CSRGraph):
+        return {OG_key: [UG.labels[i] for i in UG.target_ids(UG.index[OG_key])] for OG_key in OG.keys()}
+
     attackers_adjacency_list = {}
 
     for OG_key in OG.keys():
@@ -32,7 +44,26 @@ def build_attackers_adjacency_list(OG, UG) -> dict:
                 
     return attackers_adjacency_list
 
-import networkx as nx
+def build_reverse_adjacency_list(UG) -> dict:
+    """
+    Builds and returns the reverse adjacency list of the universe graph, in a single pass over its attacks.
+
+    Args:
+        UG (dict): The universe graph represented as a dictionary.
+
+    Returns:
+        dict: The reverse adjacency list of UG.
+        Key : argument, Value : list of the arguments it attacks (may be empty).
+    """
+
+    reverse_adjacency_list = {UG_key: [] for UG_key in UG.keys()}
+
+    for UG_key, UG_value in UG.items():
+        for attacker in UG_value:
+            reverse_adjacency_list[attacker].append(UG_key)
+
+    return reverse_adjacency_list
+
 # Variables for the star graphs
 nb_branch_star_min = 6
 nb_branch_star_max = 15
@@ -48,8 +79,11 @@ def debate_graph_generation():
     In order to build such a graph, a directed star graph is first created (via networkx) where the 
     central node is the target argument. For each branch of the star, a random tree is generated 
     (also via networkx) containing a random number of nodes.
+    See generation.generate_debate_graph for a faster, seedable generator which does not need networkx.
     """
 
+    import networkx as nx
+
     nb_branch_star = random.randrange(nb_branch_star_min, nb_branch_star_max+1)
     cpt = nb_branch_star #allows for a gradual increase in the number of arguments
 
@@ -76,18 +110,24 @@ def generate_subgraph(UG: dict, arguments: list) -> dict:
     composed of the specified list of arguments.
 
     Args:
-        UG (dict): The universe graph represented as a dictionary.
+        UG (dict | CSRGraph): The universe graph represented as a dictionary or as a CSRGraph.
         arguments (list): The list of arguments to include in the subgraph.
 
     Returns:
-        dict: The subgraph (OG) containing only the specified arguments and their relations from UG.
+        dict | CSRGraph: The subgraph (OG) containing only the specified arguments and their relations from UG
+        (a CSRGraph sharing the ids of UG when UG is a CSRGraph).
     """
+
+    if isinstance(UG, CSRGraph):
+        return UG.subgraph(arguments)
+
     OG = {}
+    members = set(arguments)
 
     # Create the subgraph of UG composed of the list of arguments in parameters.
     for arg in arguments:
         # Find the common arguments (intersection) between the specified arguments and the arguments in UG[arg].
-        common_args = list(set(arguments) & set(UG[arg]))
+        common_args = members.intersection(UG[arg])
         OG[arg] = sorted(common_args)
 
     return OG
@@ -124,95 +164,656 @@ def auto_generate_OG(UG: dict) -> dict:
 
     return generate_subgraph(UG, selected_args)
     
-def agent_order_combinations(agents: list) -> list:
+def nth_permutation(n: int, k: int) -> tuple:
+    """
+    Returns the k-th permutation of range(n), in lexicographic order (the order of itertools.permutations),
+    by decoding k in the factorial number system (Lehmer code).
+
+    Args:
+        n (int): The number of elements.
+        k (int): The index of the permutation, between 0 and n!-1.
+
+    Returns:
+        tuple: The k-th permutation.
+    """
+
+    if not 0 <= k < factorial(n):
+        raise IndexError(f"permutation index {k} out of range for {n} elements")
+
+    elements = list(range(n))
+    permutation = []
+    for i in range(n, 0, -1):
+        digit, k = divmod(k, factorial(i-1))
+        permutation.append(elements.pop(digit))
+
+    return tuple(permutation)
+
+def permutation_index(permutation) -> int:
     """
-    Generates all possible permutations of agent orderings from the given list of agents.
+    Returns the index of a permutation of range(n) in lexicographic order (inverse of nth_permutation).
+
+    Args:
+        permutation (list): A permutation of range(n).
+
+    Returns:
+        int: The index of the permutation.
+    """
+
+    n = len(permutation)
+    elements = list(range(n))
+    k = 0
+    for i, element in enumerate(permutation):
+        digit = elements.index(element)
+        elements.pop(digit)
+        k += digit * factorial(n-1-i)
+
+    return k
+
+def permutation_range(n: int, start: int, stop: int):
+    """
+    Iterates over the permutations of range(n) of index start to stop-1, in lexicographic order, without
+    enumerating the previous ones: the first one is decoded from its index, the next ones are derived in
+    place (next lexicographic permutation).
+
+    Args:
+        n (int): The number of elements.
+        start (int): The index of the first permutation.
+        stop (int): The index after the last permutation.
+
+    Yields:
+        tuple: The permutations of the range.
+    """
+
+    stop = min(stop, factorial(n))
+    if start >= stop:
+        return
+
+    permutation = list(nth_permutation(n, start))
+    for _ in range(stop - start):
+        yield tuple(permutation)
+
+        # Next permutation : swap the last ascent with the smallest greater element on its right, then reverse the tail.
+        i = n - 2
+        while i >= 0 and permutation[i] > permutation[i+1]:
+            i -= 1
+        if i < 0:
+            return
+        j = n - 1
+        while permutation[j] < permutation[i]:
+            j -= 1
+        permutation[i], permutation[j] = permutation[j], permutation[i]
+        permutation[i+1:] = reversed(permutation[i+1:])
+
+# Represents the orders of a list of agents, as a lazy sequence indexed like itertools.permutations.
+class AgentOrderings :
+
+    def __init__(self, agents: list):
+        """
+        Initializes the sequence of the orders of the given agents. No order is built before it is accessed.
+
+        Args:
+            agents (list): A list of agent objects.
+        """
+
+        self.agents = list(agents)
+
+    def __len__(self) -> int:
+        return factorial(len(self.agents))
+
+    def __getitem__(self, k: int) -> list:
+        """
+        Returns the k-th order of the agents (negative indices count from the end).
+        """
+
+        if k < 0:
+            k += len(self)
+
+        return [self.agents[i] for i in nth_permutation(len(self.agents), k)]
+
+    def __iter__(self):
+        return self.orders()
+
+    def indices(self, start=0, stop=None):
+        """
+        Iterates over the orders of index start to stop-1, as tuples of agent indices.
+        """
+
+        return permutation_range(len(self.agents), start, len(self) if stop is None else stop)
+
+    def orders(self, start=0, stop=None):
+        """
+        Iterates over the orders of index start to stop-1, as lists of agents.
+        """
+
+        for permutation in self.indices(start, stop):
+            yield [self.agents[i] for i in permutation]
+
+    def shards(self, size: int):
+        """
+        Iterates over the contiguous index ranges (start, stop) of at most size orders covering every order.
+        """
+
+        return ((start, min(start + size, len(self))) for start in range(0, len(self), size))
+
+    def index(self, order: list) -> int:
+        """
+        Returns the index of an order of the agents.
+        """
+
+        return permutation_index([self.agents.index(a) for a in order])
+
+def agent_order_combinations(agents: list) -> AgentOrderings:
+    """
+    Returns all possible permutations of agent orderings from the given list of agents.
+
+    The orderings are not materialized: the returned sequence gives the k-th permutation on demand and
+    iterates over index ranges, so that it can be split into contiguous shards.
 
     Args:
         agents (list): A list of agent objects.
 
     Returns:
-        list: A list containing all possible permutations of agent orderings.
+        AgentOrderings: A lazy sequence of all possible permutations of agent orderings.
     """
 
-    # Generate all possible permutations of agent indices.
-    agent_indices = range(len(agents))
-    permutations_indices = permutations(agent_indices)
+    return AgentOrderings(agents)
+
+# Represents a bounded LRU cache of Hbs values.
+class HbsCache :
+
+    def __init__(self, maxsize=10000):
+        """
+        Initializes an empty cache.
+
+        For a fixed universe graph, a subgraph built by generate_subgraph is fully determined by its set of
+        arguments, which is therefore used as the key. A cache must only be shared between subgraphs of the same UG.
+
+        Args:
+            maxsize (int): The maximum number of graphs kept in the cache (default is 10000).
+        """
+
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, arguments, semantics="hbs"):
+        """
+        Returns the values cached for the given set of arguments (under the given semantics), or None
+        (the entry becomes the most recent one).
+        """
+
+        key = frozenset(arguments) if semantics == "hbs" else (semantics, frozenset(arguments))
+        values = self.entries.get(key)
+
+        if values is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return values
+
+    def put(self, arguments, values: dict, semantics="hbs") -> None:
+        """
+        Stores the values of a set of arguments (under the given semantics), evicting the least recently used
+        entry when the cache is full.
+        """
+
+        key = frozenset(arguments) if semantics == "hbs" else (semantics, frozenset(arguments))
+        self.entries[key] = values
+        self.entries.move_to_end(key)
 
-    # For each permutation of indices, create a corresponding list of agents.
-    agent_combinations = []
-    for perm_indices in permutations_indices:
-        agent_order = [agents[i] for i in perm_indices]
-        agent_combinations.append(agent_order)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
 
-    return agent_combinations
+    def stats(self) -> dict:
+        """
+        Returns the number of hits, misses and evictions, and the current and maximum size of the cache.
+        """
 
-def Hbs(graph: dict, argument: str) -> float:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "maxsize": self.maxsize}
+
+def hbs_kernel(values: list) -> float:
     """
-    Implements the Harmony-based System (Hbs) algorithm to compute the harmony score for a given argument in a debate graph.
+    h-categorizer: 1 / (1 + sum of the values of the attackers).
+    """
+
+    sum = 0
+    for v in values:
+        sum += v
+    return 1 / (1 + sum)
+
+def mbs_kernel(values: list) -> float:
+    """
+    Max-based: 1 / (1 + highest value of the attackers).
+    """
+
+    return 1 / (1 + max(values, default=0))
+
+def cbs_kernel(values: list) -> float:
+    """
+    Card-based: 1 / (1 + number of attackers + mean value of the attackers), 1 when unattacked.
+    """
+
+    if len(values) == 0:
+        return 1
+    sum = 0
+    for v in values:
+        sum += v
+    return 1 / (1 + len(values) + sum / len(values))
+
+# Gradual semantics. Key : name, Value : kernel, computing the value of an argument from the list of the values of
+# its attackers (in the order of the graph).
+SEMANTICS = {}
+
+def register_semantics(name: str, kernel) -> None:
+    """
+    Adds a gradual semantics to the registry, making it available to semantics_values, the agents and the debates.
+    The impact ranges of DebateState, which let the agents prune their candidate moves, are derived for the
+    h-categorizer kernel only: the moves are evaluated exhaustively under any other kernel.
+
+    Args:
+        name (str): The name of the semantics.
+        kernel (function): Computes the value of an argument from the list of the values of its attackers
+        (kernel([]) being the value of an unattacked argument). The kernel must be decreasing in each value and
+        return values in ]0, 1].
+    """
+
+    SEMANTICS[name] = kernel
+
+def semantics_kernel(semantics: str):
+    """
+    Returns the kernel of a registered semantics.
+    """
+
+    if semantics not in SEMANTICS:
+        raise ValueError(f"Unknown semantics {semantics}, expected one of {', '.join(SEMANTICS)}.")
+    return SEMANTICS[semantics]
+
+register_semantics("hbs", hbs_kernel)
+register_semantics("mbs", mbs_kernel)
+register_semantics("cbs", cbs_kernel)
+
+def topological_order(graph: dict) -> list | None:
+    """
+    Returns the arguments of the graph ordered so that every argument comes after all of its attackers
+    (leaves first, issue last), or None if the graph contains a cycle.
 
     Args:
         graph (dict): The debate graph represented as a dictionary.
         Keys represent arguments, and values represent lists of attacking arguments.
-        argument (str): The argument for which the harmony score is to be computed.
 
     Returns:
-        float: The harmony score for the specified argument.
+        list | None: The arguments in topological order, or None if the graph is cyclic.
+    """
+
+    # Number of attackers not yet evaluated, and reverse relation (argument -> arguments it attacks).
+    remaining = {k: len(v) for k, v in graph.items()}
+    attacked = {k: [] for k in graph.keys()}
+    for key, value in graph.items():
+        for j in value:
+            attacked[j].append(key)
+
+    # Kahn's algorithm, starting from the unattacked arguments.
+    order = [k for k, n in remaining.items() if n == 0]
+    i = 0
+    while i < len(order):
+        for k in attacked[order[i]]:
+            remaining[k] -= 1
+            if remaining[k] == 0:
+                order.append(k)
+        i += 1
+
+    # Some arguments were never freed: they belong to (or depend on) a cycle.
+    if len(order) < len(graph):
+        return None
+
+    return order
+
+def Hbs_values(graph: dict, cache=None) -> dict:
+    """
+    Computes the harmony score of every argument of a debate graph.
+
+    Acyclic graphs (such as the ones built by debate_graph_generation) are evaluated exactly in a single
+    leaves-to-root pass in O(V+E). Cyclic graphs fall back to the fixed-point iteration.
+
+    Args:
+        graph (dict | CSRGraph): The debate graph represented as a dictionary or as a CSRGraph.
+        Keys represent arguments, and values represent lists of attacking arguments.
+        cache (HbsCache): A cache of the values of subgraphs of the same UG (default is None, no cache).
+
+    Returns:
+        dict: The harmony score of each argument (shared with the cache, it must not be modified).
+    """
+
+    if cache is not None:
+        values = cache.get(graph.keys())
+        if values is None:
+            values = Hbs_values(graph)
+            cache.put(graph.keys(), values)
+        return values
+
+    if isinstance(graph, CSRGraph):
+        return dict(zip(graph.labels, graph.hbs_values()))
+
+    order = topological_order(graph)
+
+    if order is None:
+        return Hbs_iterative(graph)
+
+    # Every attacker is evaluated before the arguments it attacks.
+    values = {}
+    for key in order:
+        sum = 0
+        for j in graph[key]:
+            sum += values[j]
+        values[key] = 1 / (1 + sum)
+
+    return values
+
+def semantics_values(graph: dict, semantics="hbs", cache=None) -> dict:
+    """
+    Computes the value of every argument of a debate graph under a registered semantics, with the same engine
+    as Hbs_values: a single topological pass when the graph is acyclic, and the fixed-point solver Hbs_solve
+    otherwise.
+
+    Args:
+        graph (dict | CSRGraph): The debate graph.
+        semantics (str): The name of the semantics (default is "hbs", see SEMANTICS).
+        cache (HbsCache): A cache of the values of subgraphs of the same UG (default is None, no cache).
+
+    Returns:
+        dict: The value of each argument (shared with the cache, it must not be modified).
     """
 
-    # Initialize previous steps dictionary with initial harmony scores for each argument
-    prev_steps = {k: [1] for k in graph.keys()}
+    if semantics == "hbs":
+        return Hbs_values(graph, cache)
+
+    kernel = semantics_kernel(semantics)
+
+    if cache is not None:
+        values = cache.get(graph.keys(), semantics)
+        if values is None:
+            values = semantics_values(graph, semantics)
+            cache.put(graph.keys(), values, semantics)
+        return values
+
+    order = topological_order(graph)
+
+    if order is None:
+        return Hbs_solve(graph, semantics=semantics)
+
+    values = {}
+    for key in order:
+        values[key] = kernel([values[j] for j in graph[key]])
+
+    return values
+
+def Hbs_iterative(graph: dict) -> dict:
+    """
+    Computes the harmony score of every argument with the (Jacobi) fixed-point iteration, starting 
+    from a score of 1 for each argument. Only the previous step is kept in memory.
+
+    Args:
+        graph (dict): The debate graph represented as a dictionary.
+        Keys represent arguments, and values represent lists of attacking arguments.
+
+    Returns:
+        dict: The harmony score of each argument.
+    """
+
+    # Initialize previous step with initial harmony scores for each argument
+    prev_step = {k: 1 for k in graph.keys()}
 
     # Define convergence threshold
     diff = 10**(-5)
     # Initialize variables
-    numberDiff=0
-    step=0
+    numberDiff = 0
 
     # Main iteration loop until convergence
     while(numberDiff<len(graph.keys())):
         numberDiff = 0
 
         # Compute harmony scores for all arguments
+        step = {}
         for key, value in graph.items():
-            if len(value) == 0:
-                prev_steps[key].append(1)
-            else:
-                sum = 0
-                for j in value:
-                    sum += prev_steps[j][step]
-                prev_steps[key].append(1 / (1 + sum))
-
-        # Calculate total harmony score
-        for value in prev_steps.values():
-            if abs(value[step] - value[step+1]) <= diff:
+            sum = 0
+            for j in value:
+                sum += prev_step[j]
+            step[key] = 1 / (1 + sum)
+
+        # Count the arguments which have converged
+        for key, value in step.items():
+            if abs(prev_step[key] - value) <= diff:
                 numberDiff=numberDiff+1
-        step = step + 1
+        prev_step = step
+
+    return prev_step
 
-    # Return the harmony score for the specified argument
-    return prev_steps[argument][step]
+def Hbs_solve(graph: dict, method="jacobi", aitken=False, initial=None, tol=10**(-5), max_iter=10000,
+              stats=None, semantics="hbs") -> dict:
+    """
+    Computes the harmony score of every argument of a (possibly cyclic) debate graph by fixed-point iteration,
+    with faster options than Hbs_iterative.
+
+    - method "jacobi" computes each sweep from the previous one and gives the same values as Hbs_iterative.
+      Method "gauss-seidel" uses the values updated during the current sweep, visiting the arguments in reverse
+      order (attackers are usually added after the arguments they attack, so the leaves come first). It needs
+      fewer sweeps but converges to slightly different values (within tol).
+    - aitken applies Aitken's delta-squared extrapolation to every argument every three sweeps, which removes
+      most of the oscillation of the Jacobi iteration on densely attacked graphs (an extrapolated value outside
+      ]0, 1] is discarded). Gauss-Seidel sweeps barely oscillate and usually converge faster without it.
+    - initial warm-starts the iteration, e.g. from the values of the graph before its last argument was added.
+      Missing arguments start from 1.
+    The iteration stops when no argument moves by more than tol in a sweep, or after max_iter sweeps.
+
+    Args:
+        graph (dict | CSRGraph): The debate graph.
+        method (str): "jacobi" (default) or "gauss-seidel".
+        aitken (bool): Whether to use Aitken extrapolation (default is False).
+        initial (dict): The starting values (default is None, 1 for every argument).
+        tol (float): The convergence threshold (default is 1e-5).
+        max_iter (int): The maximum number of sweeps (default is 10000).
+        stats (dict): If given, the numbers of "sweeps" and "extrapolations" are added to it, and "converged"
+        is set to whether the threshold was reached.
+        semantics (str): The name of the semantics (default is "hbs", see SEMANTICS).
+
+    Returns:
+        dict: The harmony score of each argument.
+    """
 
-def Hbs2(graph: dict, argument: str) -> float:
+    if method not in ("gauss-seidel", "jacobi"):
+        raise ValueError(f"Unknown method {method}, expected 'gauss-seidel' or 'jacobi'.")
+
+    kernel = semantics_kernel(semantics)
+    keys = list(graph.keys())
+    if method == "gauss-seidel":
+        keys.reverse()
+    attackers = {k: graph[k] for k in keys}
+
+    values = {k: 1 for k in keys}
+    if initial is not None:
+        for k in keys:
+            if k in initial:
+                values[k] = initial[k]
+
+    history = []
+    sweeps = 0
+    extrapolations = 0
+    converged = False
+
+    while sweeps < max_iter:
+        sweeps += 1
+        change = 0
+
+        if method == "jacobi":
+            step = {}
+            for key in keys:
+                step[key] = kernel([values[j] for j in attackers[key]])
+                change = max(change, abs(step[key] - values[key]))
+            values = step
+        else:
+            values = dict(values)
+            for key in keys:
+                new_value = kernel([values[j] for j in attackers[key]])
+                change = max(change, abs(new_value - values[key]))
+                values[key] = new_value
+
+        if change <= tol:
+            converged = True
+            break
+
+        if aitken:
+            history.append(values)
+            if len(history) == 3:
+                x0, x1, x2 = history
+                extrapolated = dict(x2)
+                for key in keys:
+                    denominator = x2[key] - 2 * x1[key] + x0[key]
+                    if denominator != 0:
+                        value = x2[key] - (x2[key] - x1[key])**2 / denominator
+                        if 0 < value <= 1:
+                            extrapolated[key] = value
+                values = extrapolated
+                extrapolations += 1
+                history = []
+
+    if stats is not None:
+        stats["sweeps"] = stats.get("sweeps", 0) + sweeps
+        stats["extrapolations"] = stats.get("extrapolations", 0) + extrapolations
+        stats["converged"] = converged
+
+    return values
+
+def relevant_arguments(graph: dict, argument: str) -> list:
+    """
+    Returns the arguments having a path to the given argument (including itself), i.e. the only arguments
+    whose value can change the value of the given argument.
+
+    Args:
+        graph (dict): The debate graph represented as a dictionary.
+        argument (str): The target argument.
+
+    Returns:
+        list: The arguments of the cone of the target, the target first.
+    """
+
+    cone = [argument]
+    seen = {argument}
+    i = 0
+    while i < len(cone):
+        for j in graph[cone[i]]:
+            if j not in seen:
+                seen.add(j)
+                cone.append(j)
+        i += 1
+
+    return cone
+
+def Hbs_target(graph: dict, argument: str = "0", tol=10**(-5), semantics="hbs", max_iter=10000) -> float:
+    """
+    Computes the harmony score of a single argument (the issue by default), evaluating only its cone
+    (see relevant_arguments) instead of the whole graph.
+
+    An acyclic cone is evaluated exactly in one topological pass, giving the same value as Hbs. Otherwise, the
+    cone is iterated from a score of 1 for each argument. The iteration map is decreasing, so the iterates
+    alternately overestimate and underestimate the fixed point: two consecutive values of the target bracket
+    it, and the iteration stops as soon as they are within tol of each other, returning their middle
+    (at most tol/2 from the exact value), whether the other arguments have converged or not. The value may
+    therefore differ from Hbs (within tol) on cyclic graphs.
+
+    Args:
+        graph (dict | CSRGraph): The debate graph.
+        argument (str): The argument for which the harmony score is to be computed (default is the issue "0").
+        tol (float): The width of the bracket at which the iteration stops (default is 1e-5).
+        semantics (str): The name of the semantics (default is "hbs", see SEMANTICS). The bracket holds for every
+        registered semantics, their kernels being decreasing.
+        max_iter (int): The maximum number of iterations, after which the middle of the last bracket is returned
+        (default is 10000).
+
+    Returns:
+        float: The harmony score of the argument.
+    """
+
+    kernel = semantics_kernel(semantics)
+    cone = {k: graph[k] for k in relevant_arguments(graph, argument)}
+    order = topological_order(cone)
+
+    if order is not None:
+        values = {}
+        for key in order:
+            values[key] = kernel([values[j] for j in cone[key]])
+        return values[argument]
+
+    values = {k: 1 for k in cone.keys()}
+    previous = 1
+    for _ in range(max_iter):
+        step = {}
+        for key, value in cone.items():
+            step[key] = kernel([values[j] for j in value])
+
+        if abs(step[argument] - previous) <= tol:
+            break
+
+        previous = step[argument]
+        values = step
+
+    return (step[argument] + previous) / 2
+
+def opinion_value(OG: dict, semantics="hbs", cone=False) -> float:
+    """
+    Returns the value of the issue in an opinion graph (the Vk of an agent). Every driver computes Vk with this
+    function, so that an agent makes the same moves whichever driver created it.
+
+    Args:
+        OG (dict | CSRGraph): The opinion graph.
+        semantics (str): The name of the semantics (default is "hbs", see SEMANTICS).
+        cone (bool): Whether to evaluate only the cone of the issue with Hbs_target (default is False, the whole
+        graph is evaluated like Hbs). Both give the same value on acyclic graphs, Hbs_target only approximates
+        it within its tolerance on cyclic ones.
+
+    Returns:
+        float: The value of the issue.
+    """
+
+    if cone:
+        return Hbs_target(OG, "0", semantics=semantics)
+
+    return semantics_values(OG, semantics)["0"]
+
+def Hbs(graph: dict, argument: str, cache=None) -> float:
+    """
+    Implements the Harmony-based System (Hbs) algorithm to compute the harmony score for a given argument in a debate graph.
+    Acyclic graphs are evaluated in one topological pass, cyclic ones by fixed-point iteration (see Hbs_values).
+
+    Args:
+        graph (dict | CSRGraph): The debate graph represented as a dictionary or as a CSRGraph.
+        Keys represent arguments, and values represent lists of attacking arguments.
+        argument (str): The argument for which the harmony score is to be computed.
+        cache (HbsCache): A cache of the values of subgraphs of the same UG (default is None, no cache).
+
+    Returns:
+        float: The harmony score for the specified argument.
+    """
+
+    return Hbs_values(graph, cache)[argument]
+
+def Hbs2(graph: dict, argument: str, semantics="hbs") -> float:
     """ 
-    Calculates and returns the Belief Strength (Hbs) of an argument.
+    Calculates and returns the Belief Strength (Hbs) of an argument, or its value under another registered
+    semantics, evaluating the graph once (see semantics_values).
 
     Args:
         graph (dict): The graph represented as a dictionary.
         argument (str): The argument for which to calculate the Belief Strength (Hbs).
+        semantics (str): The name of the semantics (default is "hbs", see SEMANTICS).
 
     Returns:
         float: The Belief Strength (Hbs) of the argument.
     """
-    
-    # If nobody attacks the argument, the value is of its Hbs is 1.
-    if len(graph[argument]) == 0: 
-        return 1
-    
-    else:
-        # Sum the Belief Strengths (Hbs) of all attacking arguments.
-        total_hbs = 0                  
-        for a in range(len(graph[argument])):
-            total_hbs += Hbs(graph, graph[argument][a])
-            
-        # Calculate and return the Belief Strength (Hbs) of the argument.
-        return 1 / (1 + total_hbs)
\ No newline at end of file
+
+    return semantics_values(graph, semantics)[argument]
@@ -0,0 +1,113 @@
+# tests/baseline.py
+
+"""
+The original implementation of the harmony score and of the protocol (before the incremental debate state),
+kept as the reference of the equivalence tests.
+"""
+
+def Hbs(graph: dict, argument: str) -> float:
+    """
+    The original Hbs: fixed-point iteration from 1 for every argument, until every argument moves by at
+    most 1e-5 in a step.
+    """
+
+    prev_steps = {k: [1] for k in graph.keys()}
+    diff = 10**(-5)
+    numberDiff = 0
+    step = 0
+
+    while(numberDiff<len(graph.keys())):
+        numberDiff = 0
+
+        for key, value in graph.items():
+            if len(value) == 0:
+                prev_steps[key].append(1)
+            else:
+                sum = 0
+                for j in value:
+                    sum += prev_steps[j][step]
+                prev_steps[key].append(1 / (1 + sum))
+
+        for value in prev_steps.values():
+            if abs(value[step] - value[step+1]) <= diff:
+                numberDiff=numberDiff+1
+        step = step + 1
+
+    return prev_steps[argument][step]
+
+def generate_subgraph(UG: dict, arguments: list) -> dict:
+    """
+    The original generate_subgraph.
+    """
+
+    OG = {}
+    for arg in arguments:
+        common_args = list(set(arguments) & set(UG[arg]))
+        OG[arg] = sorted(common_args)
+
+    return OG
+
+class Agent :
+    """
+    The original agent, re-evaluating a temporary public graph from scratch for every candidate move.
+    """
+
+    def __init__(self, OG, UG, cl=0.05):
+        self.OG = OG
+        self.UG = UG
+        self.Vk = Hbs(OG, "0")
+        self.cl = cl
+        self.historical = dict()
+
+    def in_comfort_zone(self, PG) -> bool:
+        Vp = Hbs(PG, "0")
+        return self.Vk - self.cl <= Vp <= self.Vk + self.cl
+
+    def get_possible_next_moves(self, PG) -> list:
+        arg_set = set()
+        for i in PG.keys():
+            arg_set |= set(self.UG[i])
+        arg_set -= set(PG.keys())
+        arg_set &= set(self.OG.keys())
+        return sorted(arg_set)
+
+    def best_next_move(self, PG, turn) -> dict:
+        Vp = Hbs(PG, "0")
+        if self.in_comfort_zone(PG):
+            self.historical[turn] = None
+            return PG
+
+        arg_to_play = None
+        gap_to_minimize = abs(Vp - self.Vk)
+        for move in self.get_possible_next_moves(PG):
+            temp_Vp = Hbs(generate_subgraph(self.UG, list(PG) + [move]), "0")
+            temp_gap = abs(temp_Vp - self.Vk)
+            if temp_gap < gap_to_minimize:
+                arg_to_play = move
+                gap_to_minimize = temp_gap
+
+        self.historical[turn] = arg_to_play
+        if arg_to_play == None:
+            return PG
+
+        return generate_subgraph(self.UG, list(PG) + [arg_to_play])
+
+def run_protocol(UG: dict, agents: list) -> tuple:
+    """
+    The original protocol: the agents play in turn until nobody adds an argument during a whole turn.
+
+    Returns:
+        tuple: The final value of the issue, the final public graph and the number of turns.
+    """
+
+    nb_turn = 0
+    PG = {"0": []}
+    previous_PG = {}
+
+    while(PG != previous_PG):
+        nb_turn += 1
+        previous_PG = PG
+        for a in agents:
+            PG = a.best_next_move(PG, nb_turn)
+
+    return Hbs(PG, "0"), PG, nb_turn
@@ -0,0 +1,81 @@
+# tests/conftest.py
+
+"""
+Shared fixtures of the tests: small seeded debates, trees and graphs with cycles, shaped like the ones of
+util.debate_graph_generation.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.util import generate_subgraph
+
+def random_debate(rng: random.Random, extra_attacks=0) -> dict:
+    """
+    Returns a star of random recursive trees converging to the issue "0", with extra_attacks random attacks
+    added on top (which may create cycles).
+    """
+
+    nb_branch = rng.randrange(4, 10)
+    UG = {"0": []}
+    cpt = nb_branch
+    for b in range(1, nb_branch+1):
+        UG[str(b)] = []
+        UG["0"].append(str(b))
+        ids = [str(b)]
+        for _ in range(1, rng.randrange(1, 6)):
+            cpt += 1
+            UG[str(cpt)] = []
+            UG[rng.choice(ids)].append(str(cpt))
+            ids.append(str(cpt))
+
+    keys = list(UG)
+    for _ in range(extra_attacks):
+        a, b = rng.sample(keys, 2)
+        if a not in UG[b]:
+            UG[b].append(a)
+
+    return UG
+
+def random_opinion_graphs(rng: random.Random, UG: dict, number_of_agents: int) -> list:
+    """
+    Returns opinion graphs drawn like util.auto_generate_OG, from the given random generator.
+    """
+
+    args = [k for k in UG if k != "0"]
+    return [generate_subgraph(UG, rng.sample(args, rng.randint(len(args)//4, len(args))) + ["0"])
+            for _ in range(number_of_agents)]
+
+@pytest.fixture(params=range(6))
+def tree(request) -> dict:
+    return random_debate(random.Random(request.param))
+
+@pytest.fixture(params=range(6))
+def cyclic(request) -> dict:
+    """
+    A debate with random extra attacks, and a cycle between an argument and one of its attackers.
+    """
+
+    rng = random.Random(100 + request.param)
+    UG = random_debate(rng, extra_attacks=4)
+    key = rng.choice([k for k in UG if k != "0" and UG[k]])
+    attacker = rng.choice(UG[key])
+    if key not in UG[attacker]:
+        UG[attacker].append(key)
+    return UG
+
+@pytest.fixture(params=[(seed, extra) for seed in range(4) for extra in (0, 3)])
+def debate(request) -> tuple:
+    """
+    A universe graph (a tree or not) and the opinion graphs of 2 to 4 agents.
+    """
+
+    seed, extra = request.param
+    rng = random.Random(seed)
+    UG = random_debate(rng, extra_attacks=extra)
+    return UG, random_opinion_graphs(rng, UG, rng.randrange(2, 5))
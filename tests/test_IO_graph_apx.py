@@ -0,0 +1,75 @@
+# tests/test_IO_graph_apx.py
+
+import os
+
+import pytest
+
+import src.IO_graph_apx
+from src.IO_graph_apx import *
+
+@pytest.fixture
+def apx(cyclic, tmp_path) -> tuple:
+    """
+    A universe graph with cycles and the path of its .apx file.
+    """
+
+    export_apx(str(tmp_path), "universe_graph", cyclic)
+    return cyclic, str(tmp_path / "universe_graph.apx")
+
+def test_parser_matches_the_graph(apx):
+    UG, path = apx
+    assert read_graph_from_apx(path) == UG
+    assert read_graph_from_apx(path, cache=True) == UG
+
+    labels, indptr, indices = parse_apx(path)
+    assert labels == list(UG)
+    assert {k: [labels[j] for j in indices[indptr[i]:indptr[i+1]]] for i, k in enumerate(labels)} == UG
+
+def test_cache_is_reused(apx, monkeypatch):
+    UG, path = apx
+    read_graph_from_apx(path, cache=True)
+    assert os.path.exists(apx_cache_path(path))
+
+    def fail(file_path):
+        raise AssertionError("The .apx file was parsed again.")
+
+    monkeypatch.setattr(src.IO_graph_apx, "parse_apx", fail)
+    assert read_graph_from_apx(path, cache=True) == UG
+
+@pytest.mark.parametrize("damage", ["empty", "truncated", "garbage"])
+def test_damaged_cache_is_rebuilt(apx, damage):
+    UG, path = apx
+    read_graph_from_apx(path, cache=True)
+    cache_path = apx_cache_path(path)
+    with open(cache_path, 'rb') as file:
+        content = file.read()
+
+    with open(cache_path, 'wb') as file:
+        file.write({"empty": b"", "truncated": content[:len(content)//2], "garbage": b"not a cache"}[damage])
+
+    assert read_graph_from_apx(path, cache=True) == UG
+    assert os.path.getsize(cache_path) == len(content)
+    # No temporary file is left behind.
+    assert sorted(os.listdir(os.path.dirname(path))) == ["universe_graph.apx", "universe_graph.apx.cache.npz"]
+
+def test_stale_cache_is_rebuilt(apx):
+    UG, path = apx
+    read_graph_from_apx(path, cache=True)
+
+    with open(path, 'a') as file:
+        file.write("arg(new).\natt(new,0).\n")
+    expected = {k: list(v) for k, v in UG.items()}
+    expected["0"].append("new")
+    expected["new"] = []
+
+    assert read_graph_from_apx(path, cache=True) == expected
+
+@pytest.mark.parametrize("attack", ["att(ghost,0).\n", "att(0,ghost).\n"])
+@pytest.mark.parametrize("cache", [False, True])
+def test_undeclared_argument(tmp_path, attack, cache):
+    path = tmp_path / "graph.apx"
+    path.write_text("arg(0).\narg(1).\natt(1,0).\n" + attack)
+
+    with pytest.raises(ValueError, match="ghost"):
+        read_graph_from_apx(str(path), cache=cache)
+    assert not os.path.exists(apx_cache_path(str(path)))
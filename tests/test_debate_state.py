@@ -0,0 +1,112 @@
+# tests/test_debate_state.py
+
+import random
+
+import pytest
+
+import baseline
+from src.util import *
+from src.debate_state import DebateState
+
+def grow(state: DebateState, rng: random.Random, nb_moves: int) -> list:
+    """
+    Adds up to nb_moves random arguments of the frontier to the state, and returns them.
+    """
+
+    added = []
+    for _ in range(nb_moves):
+        if not state.frontier:
+            break
+        argument = rng.choice(sorted(state.frontier))
+        state.add_argument(argument)
+        added.append(argument)
+
+    return added
+
+def check_state(state: DebateState, UG: dict, added: list) -> None:
+    PG = generate_subgraph(UG, ["0"] + added)
+    assert state.PG == PG
+    assert state.frontier == {a for k in PG for a in UG[k] if a not in PG}
+
+    reference = Hbs_values(PG)
+    for key in PG:
+        assert state.value(key) == pytest.approx(reference[key], abs=10**(-12))
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_values_match_scratch(tree, seed):
+    rng = random.Random(seed)
+    state = DebateState(tree)
+    added = []
+    while state.frontier:
+        added += grow(state, rng, 1)
+        check_state(state, tree, added)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_values_match_scratch_with_cycles(cyclic, seed):
+    rng = random.Random(seed)
+    state = DebateState(cyclic, cache=HbsCache())
+    added = grow(state, rng, len(cyclic))
+    check_state(state, cyclic, added)
+
+def test_copy_is_independent(tree):
+    rng = random.Random(2)
+    state = DebateState(tree)
+    added = grow(state, rng, 3)
+    fork = state.copy()
+    more = grow(fork, rng, 3)
+    check_state(state, tree, added)
+    check_state(fork, tree, added + more)
+
+def test_self_attack_matches_generate_subgraph():
+    # att(1,1): the self-attack is part of the public graph and makes it cyclic.
+    UG = {"0": ["1", "2"], "1": ["1", "3"], "2": ["1"], "3": []}
+    state = DebateState(UG)
+    assert state.what_if("1") == pytest.approx(Hbs_iterative(generate_subgraph(UG, ["0", "1"]))["0"])
+    assert state.impact_ranges(["1"])["1"] == (-float("inf"), float("inf"))
+
+    state.add_argument("1")
+    check_state(state, UG, ["1"])
+    assert state.PG["1"] == ["1"]
+    assert not state.acyclic
+    assert state.value("0") == pytest.approx(0.618034, abs=10**(-5))
+
+    state.add_argument("2")
+    check_state(state, UG, ["1", "2"])
+
+def test_what_if_matches_baseline(debate):
+    UG, OGs = debate
+    rng = random.Random(0)
+    state = DebateState(UG)
+    for _ in range(6):
+        for move in state.possible_moves(UG):
+            expected = baseline.Hbs(baseline.generate_subgraph(UG, list(state.PG) + [move]), "0")
+            assert state.what_if(move) == pytest.approx(expected, abs=10**(-5))
+            assert state.score_moves([move]) == {move: state.what_if(move)}
+        grow(state, rng, 1)
+
+def test_impact_ranges_contain_the_change(debate):
+    UG, OGs = debate
+    rng = random.Random(1)
+    state = DebateState(UG)
+    for _ in range(6):
+        moves = state.possible_moves(UG)
+        ranges = state.impact_ranges(moves)
+        for move in moves:
+            low, high = ranges[move]
+            assert low <= state.what_if(move) - state.value("0") <= high
+        grow(state, rng, 1)
+
+@pytest.mark.parametrize("method", ["jacobi", "gauss-seidel"])
+def test_warm_start_stays_within_threshold(cyclic, method):
+    rng = random.Random(5)
+    cold = DebateState(cyclic)
+    warm = DebateState(cyclic, warm_start=True, method=method)
+    while cold.frontier:
+        argument = rng.choice(sorted(cold.frontier))
+        cold.add_argument(argument)
+        warm.add_argument(argument)
+        for key in cold.PG:
+            assert warm.value(key) == pytest.approx(cold.value(key), abs=10**(-4))
+
+    assert not warm.acyclic
+    assert warm.solver_stats["sweeps"] > 0 and warm.solver_stats["converged"]
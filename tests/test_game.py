@@ -0,0 +1,231 @@
+# tests/test_game.py
+
+import random
+
+import pytest
+
+import baseline
+import src.agent
+from src.game import *
+
+def results(runs) -> list:
+    """
+    Returns the comparable part of the results of the orders: order, value of the issue, public graph,
+    number of turns and historical of the agents.
+    """
+
+    return [(names, vp, list(PG.items()), nb_turn, [dict(a.historical) for a in agents])
+            for vp, PG, names, agents, nb_turn in runs]
+
+def test_protocol_matches_baseline(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+
+    for vp, PG, names, ordered, nb_turn in run_all_protocols(UG, agents):
+        reference = [baseline.Agent(OGs[a.get_number()], UG) for a in ordered]
+        expected_vp, expected_PG, expected_nb_turn = baseline.run_protocol(UG, reference)
+
+        assert vp == pytest.approx(expected_vp, abs=10**(-5))
+        assert PG == expected_PG
+        assert nb_turn == expected_nb_turn
+        assert [a.historical for a in ordered] == [a.historical for a in reference]
+
+@pytest.mark.parametrize("seed", range(4))
+def test_protocol_matches_baseline_with_self_attacks(debate, seed):
+    UG, OGs = debate
+    rng = random.Random(seed)
+    for key in rng.sample([k for k in UG if k != "0"], 2):
+        UG[key].append(key)
+    OGs = [generate_subgraph(UG, list(OG)) for OG in OGs]
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+
+    for vp, PG, names, ordered, nb_turn in run_all_protocols(UG, agents):
+        reference = [baseline.Agent(OGs[a.get_number()], UG) for a in ordered]
+        expected_vp, expected_PG, expected_nb_turn = baseline.run_protocol(UG, reference)
+
+        assert vp == pytest.approx(expected_vp, abs=10**(-5))
+        assert PG == expected_PG
+        assert nb_turn == expected_nb_turn
+
+def test_pruning_does_not_change_moves(debate, monkeypatch):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    expected = results(run_all_protocols(UG, agents))
+
+    monkeypatch.setattr(src.agent, "pruning_min_moves", 1)
+    assert results(run_all_protocols(UG, agents)) == expected
+    assert sum(a.move_stats["pruned"] for a in agents) > 0
+
+def test_run_all_protocols_matches_run_protocol(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    expected = []
+    for order in find_all_combinations(agents):
+        for a in agents:
+            a.historical = dict()
+        expected += results([run_protocol(UG, order)])
+
+    assert results(run_all_protocols(UG, agents, cache=HbsCache())) == expected
+
+def test_workers_match_one_process(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    expected = results(run_all_protocols(UG, agents))
+    evaluated = sum(a.move_stats["evaluated"] for a in agents)
+
+    for a in agents:
+        a.move_stats = {"evaluated": 0, "pruned": 0}
+    assert results(play_all_orders(UG, agents, workers=2, symmetry=False)) == expected
+    assert sum(a.move_stats["evaluated"] for a in agents) >= evaluated # Shards do not share their first turns.
+    assert all(a.historical == {} for a in agents)
+
+def test_run_all_protocols_shards(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    expected = results(run_all_protocols(UG, agents))
+    middle = len(expected) // 2
+
+    assert results(run_all_protocols(UG, agents, start=0, stop=middle)) == expected[:middle]
+    assert results(run_all_protocols(UG, agents, start=middle)) == expected[middle:]
+
+@pytest.mark.parametrize("stratified", [False, True])
+def test_sampling_draws_actual_orders(debate, stratified):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    every_order = {names: (vp, list(PG.items()), nb_turn) for vp, PG, names, _, nb_turn in run_all_protocols(UG, agents)}
+
+    summary = {}
+    samples = [(names, vp, list(PG.items()), nb_turn, [a.get_number() for a in ordered])
+               for vp, PG, names, ordered, nb_turn in sample_protocols(UG, agents, summary, half_width=0,
+                                                                       max_samples=40, stratified=stratified, seed=3)]
+
+    assert len(samples) == summary["samples"] <= 40
+    for names, vp, PG, nb_turn, numbers in samples:
+        assert every_order[names] == (vp, PG, nb_turn)
+    if stratified:
+        assert [numbers[0] for *_, numbers in samples] == [agents[k % len(agents)].get_number()
+                                                           for k in range(len(samples))]
+    else:
+        assert summary["mean"] == pytest.approx(sum(vp for _, vp, *_ in samples) / len(samples))
+
+    # Same seed, same orders.
+    again = [names for _, _, names, _, _ in sample_protocols(UG, agents, {}, half_width=0, max_samples=40,
+                                                             stratified=stratified, seed=3)]
+    assert again == [names for names, *_ in samples]
+
+def test_sampling_stops_at_the_requested_precision(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+
+    summary = {}
+    list(sample_protocols(UG, agents, summary, half_width=1, min_samples=10, seed=0))
+    assert summary["converged"] and summary["samples"] == 10
+    assert summary["half_width"] <= 1
+
+    summary = {}
+    list(sample_protocols(UG, agents, summary, half_width=0, min_samples=10, max_samples=25, seed=0))
+    assert summary["samples"] == 25 or summary["half_width"] == 0
+    assert summary["converged"] == (summary["half_width"] == 0)
+
+    position_effects = summary["position_effects"]
+    assert sorted(position_effects) == sorted(a.get_number() for a in agents)
+    assert all(len(effects) == len(agents) for effects in position_effects.values())
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_symmetry_matches_every_order(debate, workers):
+    UG, OGs = debate
+    # Interchangeable and inert agents, so that the symmetry applies.
+    OGs = OGs + [OGs[0], {"0": []}]
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    expected = results(play_all_orders(UG, agents, symmetry=False))
+
+    stats = {}
+    assert results(play_all_orders(UG, agents, workers=workers, stats=stats)) == expected
+    assert stats["simulated"] < stats["orders"]
+
+def test_run_order_list_matches_run_all_protocols(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    every_order = list(permutations(range(len(agents))))
+    expected = dict(zip(every_order, results(run_all_protocols(UG, agents))))
+
+    orders = every_order[::3]
+    simulated = {order: results([result])[0] for order, result in run_order_list(UG, agents, orders)}
+    assert simulated == {order: expected[order] for order in orders}
+
+def test_interacting_groups_split_inert_agents():
+    # 1 and 2 attack the issue, 3 attacks 1 and 4 attacks 3.
+    UG = {"0": ["1", "2"], "1": ["3"], "2": [], "3": ["4"], "4": []}
+    OGs = [generate_subgraph(UG, ["0", "1"]),
+           {"0": []},
+           generate_subgraph(UG, ["0", "4"]), # 4 can only attack 3, which nobody can play.
+           generate_subgraph(UG, ["0", "2"]),
+           generate_subgraph(UG, ["0", "1"])]
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+
+    assert reachable_arguments(UG, agents) == {"0", "1", "2"}
+    assert interacting_groups(UG, agents) == [[0, 3, 4], [1], [2]]
+    assert agent_equivalence_classes(UG, agents) == [0, None, None, 3, 0]
+
+def test_single_interacting_agent_is_order_independent(tree):
+    OGs = [auto_generate_OG(tree), {"0": []}, {"0": []}]
+    agents = [agent(k, OGs[k], tree) for k in range(len(OGs))]
+
+    stats = {}
+    played = results(play_all_orders(tree, agents, stats=stats))
+    assert stats["order_independent"] and stats["interacting_agents"] == [0]
+    assert all(run[1:4] == played[0][1:4] for run in played)
+
+def reference_semantics(kernel):
+    """
+    Returns baseline.Hbs with the h-categorizer replaced by the given kernel: the same fixed-point iteration
+    from 1 for every argument, until every argument moves by at most 1e-5 in a step.
+    """
+
+    def value(graph: dict, argument: str) -> float:
+        values = {k: 1 for k in graph.keys()}
+        while True:
+            step = {key: kernel([values[j] for j in attackers]) for key, attackers in graph.items()}
+            if all(abs(step[key] - values[key]) <= 10**(-5) for key in graph):
+                return step[argument]
+            values = step
+
+    return value
+
+@pytest.mark.parametrize("semantics", ["mbs", "cbs"])
+def test_protocol_matches_baseline_with_other_semantics(debate, semantics, monkeypatch):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG, semantics=semantics) for k in range(len(OGs))]
+    monkeypatch.setattr(baseline, "Hbs", reference_semantics(semantics_kernel(semantics)))
+
+    for vp, PG, names, ordered, nb_turn in run_all_protocols(UG, agents, semantics=semantics):
+        reference = [baseline.Agent(OGs[a.get_number()], UG) for a in ordered]
+        expected_vp, expected_PG, expected_nb_turn = baseline.run_protocol(UG, reference)
+
+        assert vp == pytest.approx(expected_vp, abs=10**(-5))
+        assert PG == expected_PG
+        assert nb_turn == expected_nb_turn
+
+@pytest.mark.parametrize("semantics", ["mbs", "cbs"])
+def test_drivers_agree_with_other_semantics(debate, semantics):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG, semantics=semantics) for k in range(len(OGs))]
+    expected = []
+    for order in find_all_combinations(agents):
+        for a in agents:
+            a.historical = dict()
+        expected += results([run_protocol(UG, order, semantics=semantics)])
+
+    assert results(run_all_protocols(UG, agents, semantics=semantics)) == expected
+    assert results(play_all_orders(UG, agents, workers=2, semantics=semantics)) == expected
+
+def test_semantics_mismatch_is_rejected(debate):
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG, semantics="mbs") for k in range(len(OGs))]
+
+    with pytest.raises(ValueError):
+        run_protocol(UG, agents)
+    with pytest.raises(ValueError):
+        list(run_all_protocols(UG, agents, semantics="cbs"))
+    with pytest.raises(ValueError):
+        list(play_all_orders(UG, agents))
@@ -0,0 +1,102 @@
+# tests/test_generation.py
+
+import pytest
+
+from src.util import *
+from src.generation import TOPOLOGIES, generate_debate_graph, generate_opinion_graphs
+from src.IO_graph_apx import read_graph_from_apx
+
+def branches(UG: dict) -> dict:
+    """
+    Returns the arguments of each branch of a debate graph generated as trees, keyed by the root of the branch.
+    """
+
+    target = {a: k for k, attackers in UG.items() for a in attackers}
+    members = {root: [] for root in UG["0"]}
+    for k in UG:
+        if k != "0":
+            root = k
+            while target[root] != "0":
+                root = target[root]
+            members[root].append(k)
+
+    return members
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_generate_debate_graph_is_seeded(topology):
+    UG = generate_debate_graph(seed=1, topology=topology)
+    assert UG == generate_debate_graph(seed=1, topology=topology)
+    assert list(UG.items()) != list(generate_debate_graph(seed=2, topology=topology).items())
+
+@pytest.mark.parametrize("topology", ["random", "chain", "bushy"])
+@pytest.mark.parametrize("seed", range(4))
+def test_branches_are_trees_of_the_requested_sizes(topology, seed):
+    UG = generate_debate_graph(seed=seed, topology=topology, nb_branch_min=3, nb_branch_max=5,
+                               tree_size_min=2, tree_size_max=8)
+    assert topological_order(UG) is not None
+    assert sorted(a for attackers in UG.values() for a in attackers) == sorted(k for k in UG if k != "0")
+
+    members = branches(UG)
+    assert 3 <= len(members) <= 5
+    assert all(2 <= len(arguments) < 8 for arguments in members.values())
+
+    if topology == "chain":
+        assert all(len(attackers) <= 1 for k, attackers in UG.items() if k != "0")
+
+def test_topologies_change_the_depth():
+    def depth(UG, k="0"):
+        return 1 + max((depth(UG, a) for a in UG[k]), default=0)
+
+    parameters = dict(seed=0, nb_branch_min=20, nb_branch_max=20, tree_size_min=30, tree_size_max=31)
+    depths = {topology: depth(generate_debate_graph(topology=topology, **parameters))
+              for topology in ("chain", "random", "bushy")}
+    assert depths["chain"] == 31 > depths["random"] > depths["bushy"]
+
+def test_cyclic_topology():
+    UG = generate_debate_graph(seed=0, topology="cyclic", cycle_ratio=0.5)
+    assert topological_order(UG) is None
+    for k, attackers in UG.items():
+        assert attackers == sorted(set(attackers), key=int) # No duplicated attack.
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_outputs_agree(topology, tmp_path):
+    path = str(tmp_path / "universe_graph.apx")
+    UG = generate_debate_graph(seed=3, topology=topology, apx_path=path)
+    assert generate_debate_graph(output="csr", seed=3, topology=topology) == UG
+    assert read_graph_from_apx(path) == UG
+    assert generate_debate_graph(output=None, seed=3, topology=topology) is None
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        generate_debate_graph(topology="star")
+    with pytest.raises(ValueError):
+        generate_debate_graph(tree_size_min=0)
+    with pytest.raises(ValueError):
+        generate_debate_graph(output="networkx")
+
+def test_opinion_graphs_match_generate_subgraph(debate):
+    UG, _ = debate
+    OGs, nbAtts, Vks = generate_opinion_graphs(UG, 20, seed=0)
+    assert Vks is None # The values are opt-in.
+    for OG, nbAtt in zip(OGs, nbAtts):
+        assert "0" in OG and len(OG) - 1 >= (len(UG) - 1) // 4
+        assert OG == generate_subgraph(UG, [k for k in UG if k in OG])
+        assert list(OG) == [k for k in UG if k in OG]
+        assert nbAtt == sum(len(v) for v in OG.values())
+
+    matrix, matrix_nbAtts, _ = generate_opinion_graphs(UG, 20, seed=0, output=None)
+    assert [{k for k, kept in zip(UG, row) if kept} for row in matrix] == [set(OG) for OG in OGs]
+    assert matrix_nbAtts == nbAtts
+
+def test_opinion_graph_values(debate):
+    UG, _ = debate
+    OGs, _, Vks = generate_opinion_graphs(UG, 20, seed=1, with_Vk=True, chunk_size=7)
+    for OG, Vk in zip(OGs, Vks):
+        assert Vk == pytest.approx(Hbs(OG, "0"), abs=10**(-4))
+
+    # The iteration on cyclic graphs stops after max_iter sweeps.
+    _, _, bounded = generate_opinion_graphs(UG, 20, seed=1, with_Vk=True, chunk_size=7, max_iter=1)
+    if topological_order(UG) is None:
+        assert bounded != Vks
+    else:
+        assert bounded == pytest.approx(Vks, abs=10**(-12))
@@ -0,0 +1,66 @@
+# tests/test_graph.py
+
+import random
+
+import pytest
+
+from src.util import *
+from src.game import agent, run_all_protocols
+from src.graph import CSRGraph
+from src.IO_graph_apx import export_apx
+
+def test_from_dict_round_trip(cyclic):
+    assert CSRGraph.from_dict(cyclic).to_dict() == cyclic
+
+def test_from_apx_matches_from_dict(cyclic, tmp_path):
+    export_apx(str(tmp_path), "universe_graph", cyclic)
+    for cache in (False, True, True):
+        assert CSRGraph.from_apx(str(tmp_path / "universe_graph.apx"), cache=cache) == cyclic
+
+@pytest.mark.parametrize("seed", range(4))
+def test_subgraph_matches_generate_subgraph(debate, seed):
+    UG, OGs = debate
+    graph = CSRGraph.from_dict(UG)
+    arguments = random.Random(seed).sample(list(UG), len(UG) // 2) + ["0"]
+    subgraph = graph.subgraph(arguments)
+    expected = generate_subgraph(UG, arguments)
+    assert subgraph.to_dict() == expected
+    assert subgraph == expected
+    assert list(subgraph.items()) == list(expected.items())
+
+    for k in UG:
+        assert (k in subgraph) == (k in expected)
+        if k in expected:
+            assert subgraph[k] == expected[k]
+        else:
+            with pytest.raises(KeyError):
+                subgraph[k]
+
+def test_hbs_values_match_hbs(debate):
+    UG, OGs = debate
+    graph = CSRGraph.from_dict(UG)
+    for OG in OGs:
+        subgraph = graph.subgraph(list(OG))
+        values = Hbs_values(OG)
+        assert subgraph.hbs_values() == pytest.approx([values[k] for k in OG], abs=10**(-12))
+        assert Hbs(subgraph, "0") == pytest.approx(Hbs(OG, "0"), abs=10**(-12))
+
+def test_debate_on_a_csr_universe(debate):
+    UG, OGs = debate
+    graph = CSRGraph.from_dict(UG)
+    expected = [(vp, list(PG.items()), names, nb_turn) for vp, PG, names, _, nb_turn
+                in run_all_protocols(UG, [agent(k, OGs[k], UG) for k in range(len(OGs))])]
+
+    played = [(vp, list(PG.items()), names, nb_turn) for vp, PG, names, _, nb_turn
+              in run_all_protocols(graph, [agent(k, OGs[k], graph) for k in range(len(OGs))])]
+    assert played == expected
+
+def test_mask_matches_the_arguments(debate):
+    UG, OGs = debate
+    graph = CSRGraph.from_dict(UG)
+    assert graph.get_mask() == (1 << len(UG)) - 1
+    for OG in OGs:
+        subgraph = graph.subgraph(list(OG))
+        assert subgraph.mask is None # Built on demand only.
+        assert subgraph.get_mask() == sum(1 << graph.index[k] for k in OG)
+        assert all(subgraph.contains_id(i) == (graph.labels[i] in OG) for i in range(len(UG)))
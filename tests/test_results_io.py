@@ -0,0 +1,116 @@
+# tests/test_results_io.py
+
+import filecmp
+
+import pandas as pd
+import pytest
+
+from src.game import *
+from src.results_io import CSVResultSink, load_results, result_row
+
+@pytest.fixture
+def runs(debate) -> tuple:
+    """
+    The universe graph, the agents and the results of every order of a debate, with the historical of the
+    agents copied for each order.
+    """
+
+    UG, OGs = debate
+    agents = [agent(k, OGs[k], UG) for k in range(len(OGs))]
+    played = []
+    for vp, PG, names, ordered, nb_turn in run_all_protocols(UG, agents):
+        played.append((PG, names, vp, nb_turn, [(a, dict(a.historical)) for a in ordered]))
+
+    return UG, agents, played
+
+def replay(played):
+    """
+    Iterates over the results of the orders, with the historical of the agents set for each one.
+    """
+
+    for PG, names, vp, nb_turn, historicals in played:
+        for a, historical in historicals:
+            a.historical = historical
+        yield PG, names, vp, nb_turn, [a for a, _ in historicals]
+
+def test_csv_sink_matches_pandas(runs, tmp_path):
+    UG, agents, played = runs
+    data = {"order": [], "Vp": [], "numberOfTurn": []}
+    for a in agents:
+        data[a.get_number()] = []
+    data_2 = {"order": [], "Vp": [], "numberOfTurn": [], "turnHistory": []}
+
+    with open_result_sink(str(tmp_path / "data.csv"), str(tmp_path / "data_2.csv"), agents) as sink:
+        for PG, names, vp, nb_turn, ordered in replay(played):
+            sink.add(PG, names, vp, nb_turn, ordered)
+            export_results(data, PG, names, vp, nb_turn, ordered)
+            export_results_2(data_2, names, vp, nb_turn, ordered)
+
+    pd.DataFrame(data).to_csv(tmp_path / "expected.csv", index=False)
+    pd.DataFrame(data_2).to_csv(tmp_path / "expected_2.csv", index=False)
+    assert filecmp.cmp(tmp_path / "data.csv", tmp_path / "expected.csv", shallow=False)
+    assert filecmp.cmp(tmp_path / "data_2.csv", tmp_path / "expected_2.csv", shallow=False)
+
+def test_csv_sink_writes_by_chunks(runs, tmp_path):
+    UG, agents, played = runs
+    sink = CSVResultSink(str(tmp_path / "data.csv"), str(tmp_path / "data_2.csv"), agents, chunk_size=2)
+    for count, (PG, names, vp, nb_turn, ordered) in enumerate(replay(played), 1):
+        sink.add(PG, names, vp, nb_turn, ordered)
+        if count % 2 == 0:
+            # The header and every row so far, without waiting for the end of the run.
+            assert len((tmp_path / "data_2.csv").read_text().splitlines()) == 1 + count
+    sink.close()
+
+    assert len(pd.read_csv(tmp_path / "data.csv")) == len(played)
+
+def test_npz_sink_round_trip(runs, tmp_path):
+    UG, agents, played = runs
+    with open_result_sink(str(tmp_path / "data.csv"), None, agents, "npz") as sink:
+        for PG, names, vp, nb_turn, ordered in replay(played):
+            sink.add(PG, names, vp, nb_turn, ordered)
+
+    columns = load_results(str(tmp_path / "data.npz"))
+    assert columns["Vp"].tolist() == [vp for _, _, vp, _, _ in played]
+    assert columns["numberOfTurn"].tolist() == [nb_turn for _, _, _, nb_turn, _ in played]
+    assert [",".join(f"A{k}" for k in row) for row in columns["order"].tolist()] == [names for _, names, _, _, _ in played]
+
+    for i, (PG, names, vp, nb_turn, ordered) in enumerate(replay(played)):
+        row = result_row(PG, names, vp, nb_turn, ordered)
+        for a in ordered:
+            k = a.get_number()
+            _, in_comfort_zone, _, nb_played, nbArg, nbAtt, distance = row[k]
+            assert (columns[f"agent_{k}_in_comfort_zone"][i], columns[f"agent_{k}_nb_played"][i],
+                    columns[f"agent_{k}_nbArg"][i], columns[f"agent_{k}_nbAtt"][i],
+                    columns[f"agent_{k}_distance"][i]) == (in_comfort_zone, nb_played, nbArg, nbAtt, distance)
+
+        moves = [str(a.historical[turn]) for turn in range(1, nb_turn+1) for a in ordered
+                 if a.historical[turn] != None]
+        kept = (columns["turns_order"] == i) & (columns["turns_argument"] != "")
+        assert columns["turns_argument"][kept].tolist() == moves
+
+def test_unknown_result_format(tmp_path):
+    with pytest.raises(ValueError):
+        open_result_sink(str(tmp_path / "data.csv"), None, [], "parquet")
+
+def test_public_graph_archive_round_trip(runs, tmp_path):
+    UG, agents, played = runs
+    (tmp_path / "expected").mkdir()
+    (tmp_path / "archived").mkdir()
+    path = str(tmp_path / "public_graphs.json.gz")
+
+    with PublicGraphArchive(path) as archive:
+        for PG, names, vp, nb_turn, ordered in played:
+            archive.add(names, PG)
+            export_apx(str(tmp_path / "expected"), names, PG)
+
+    graphs, orders = read_public_graph_archive(path)
+    assert len(graphs) == len({tuple(PG) for PG, *_ in played})
+    assert list(orders) == [names for _, names, *_ in played]
+
+    for PG, names, vp, nb_turn, ordered in played:
+        assert list(public_graph_from_archive(path, UG, names).items()) == list(PG.items())
+
+    export_apx_from_archive(path, UG, str(tmp_path / "archived"))
+    for PG, names, vp, nb_turn, ordered in played:
+        assert filecmp.cmp(tmp_path / "expected" / f"{names}.apx", tmp_path / "archived" / f"{names}.apx",
+                           shallow=False)
@@ -0,0 +1,153 @@
+# tests/test_util.py
+
+import pytest
+
+import baseline
+import src.util
+from src.util import *
+from src.hbs_batch import Hbs_batch
+
+def test_hbs_matches_baseline_on_trees(tree):
+    assert topological_order(tree) is not None
+    values = Hbs_values(tree)
+    for key in tree:
+        assert Hbs(tree, key) == values[key]
+        assert values[key] == pytest.approx(baseline.Hbs(tree, key), abs=10**(-5))
+
+def test_hbs_matches_baseline_on_cycles(cyclic):
+    assert topological_order(cyclic) is None
+    values = Hbs_iterative(cyclic)
+    assert Hbs_values(cyclic) == values
+    for key in cyclic:
+        assert values[key] == baseline.Hbs(cyclic, key)
+
+def test_hbs_batch_matches_hbs(debate):
+    UG, OGs = debate
+    graphs = OGs + [UG]
+    for value, values, graph in zip(Hbs_batch(graphs), Hbs_batch(graphs, None), graphs):
+        assert value == values["0"]
+        for key in graph:
+            assert values[key] == pytest.approx(Hbs(graph, key), abs=10**(-4))
+
+def test_hbs_batch_stops_after_max_iter(cyclic):
+    values = Hbs_batch([cyclic], None, tol=0, max_iter=7)[0]
+    expected = Hbs_solve(cyclic, tol=0, max_iter=7)
+    for key in cyclic:
+        assert values[key] == pytest.approx(expected[key], abs=10**(-12))
+
+def test_cache_returns_same_values(debate):
+    UG, OGs = debate
+    cache = HbsCache(maxsize=len(OGs))
+    for OG in OGs + OGs:
+        assert Hbs(OG, "0", cache) == Hbs(OG, "0")
+    assert cache.stats()["hits"] >= len(OGs)
+
+def test_cache_evicts_least_recently_used():
+    cache = HbsCache(maxsize=2)
+    cache.put(["0"], {"0": 1})
+    cache.put(["0", "1"], {"0": 0.5, "1": 1})
+    assert cache.get(["0"]) == {"0": 1}
+    cache.put(["0", "2"], {"0": 0.5, "2": 1})
+    assert cache.get(["1", "0"]) is None
+    assert cache.get(["0"]) == {"0": 1}
+    assert cache.get(["0"], "mbs") is None
+    assert cache.stats()["evictions"] == 1
+
+@pytest.mark.parametrize("n", range(1, 6))
+def test_permutations_match_itertools(n):
+    expected = list(permutations(range(n)))
+    assert [nth_permutation(n, k) for k in range(factorial(n))] == expected
+    assert [permutation_index(p) for p in expected] == list(range(factorial(n)))
+    for start in range(factorial(n)):
+        assert list(permutation_range(n, start, factorial(n))) == expected[start:]
+
+def test_agent_orderings_shards():
+    orderings = agent_order_combinations(["a", "b", "c", "d"])
+    assert len(orderings) == 24
+    assert orderings[5] == list(orderings)[5] == ["a", "d", "c", "b"]
+    assert orderings[-1] == ["d", "c", "b", "a"]
+    assert orderings.index(["c", "a", "d", "b"]) == 13
+    assert [list(orderings.indices(start, stop)) for start, stop in orderings.shards(7)] == \
+        [list(permutations(range(4)))[k:k+7] for k in range(0, 24, 7)]
+    with pytest.raises(IndexError):
+        nth_permutation(3, 6)
+
+def test_opinion_value_matches_hbs(debate):
+    UG, OGs = debate
+    for OG in OGs:
+        assert opinion_value(OG) == Hbs(OG, "0")
+        assert opinion_value(OG, cone=True) == pytest.approx(Hbs(OG, "0"), abs=10**(-5))
+
+def test_cone_is_exact_on_trees(tree):
+    assert opinion_value(tree, cone=True) == pytest.approx(Hbs(tree, "0"), abs=10**(-12))
+
+def test_cone_brackets_the_value_on_cycles(cyclic):
+    exact = Hbs_solve(cyclic, tol=10**(-12))["0"]
+    for tol in (10**(-3), 10**(-5)):
+        assert abs(Hbs_target(cyclic, "0", tol=tol) - exact) <= tol / 2
+
+def test_cone_ignores_the_arguments_without_path_to_the_issue(tree):
+    cone = relevant_arguments(tree, "0")
+    assert cone[0] == "0" and sorted(cone) == sorted(tree) # Every argument of a debate tree reaches the issue.
+
+    # A cycle attacked by an argument of the tree has no path to the issue: the cone stays acyclic and exact.
+    graph = dict(tree)
+    graph["x"], graph["y"] = ["y", cone[-1]], ["x"]
+    assert topological_order(graph) is None
+    assert relevant_arguments(graph, "0") == cone
+    assert opinion_value(graph, cone=True) == pytest.approx(Hbs(tree, "0"), abs=10**(-12))
+    assert opinion_value(graph) == pytest.approx(Hbs(tree, "0"), abs=10**(-5))
+
+def test_jacobi_solver_matches_iterative(cyclic):
+    assert Hbs_solve(cyclic) == Hbs_iterative(cyclic)
+
+@pytest.mark.parametrize("method", ["jacobi", "gauss-seidel"])
+@pytest.mark.parametrize("aitken", [False, True])
+def test_solvers_within_threshold(cyclic, method, aitken):
+    exact = Hbs_solve(cyclic, tol=10**(-12))
+    stats = {}
+    values = Hbs_solve(cyclic, method, aitken=aitken, stats=stats)
+    assert stats["converged"] and stats["sweeps"] > 0
+    assert (stats["extrapolations"] > 0) == (aitken and stats["sweeps"] > 3)
+    for key in cyclic:
+        assert values[key] == pytest.approx(exact[key], abs=10**(-4))
+
+def test_warm_start_from_the_fixed_point(cyclic):
+    exact = Hbs_solve(cyclic, tol=10**(-12))
+    cold, warm = {}, {}
+    Hbs_solve(cyclic, stats=cold)
+    values = Hbs_solve(cyclic, initial=exact, stats=warm)
+    assert warm["sweeps"] == 1 < cold["sweeps"]
+    assert values == pytest.approx(exact, abs=10**(-5))
+
+    # Arguments missing from the starting values start from 1.
+    partial = {k: v for k, v in exact.items() if k != "0"}
+    assert Hbs_solve(cyclic, initial=partial) == pytest.approx(exact, abs=10**(-4))
+
+def test_solver_stops_after_max_iter(cyclic):
+    stats = {}
+    Hbs_solve(cyclic, tol=0, max_iter=3, stats=stats)
+    assert stats["sweeps"] == 3 and not stats["converged"]
+
+    with pytest.raises(ValueError):
+        Hbs_solve(cyclic, "newton")
+
+@pytest.mark.parametrize("semantics", ["hbs", "mbs", "cbs"])
+def test_semantics_values_on_trees(tree, semantics):
+    kernel = semantics_kernel(semantics)
+
+    def recursive(argument):
+        return kernel([recursive(a) for a in tree[argument]])
+
+    values = semantics_values(tree, semantics)
+    for key in tree:
+        assert values[key] == pytest.approx(recursive(key), abs=10**(-12))
+        assert Hbs2(tree, key, semantics) == values[key]
+
+def test_registered_semantics(tree, monkeypatch):
+    monkeypatch.setattr(src.util, "SEMANTICS", dict(SEMANTICS))
+    register_semantics("copy", hbs_kernel)
+    assert semantics_values(tree, "copy") == semantics_values(tree, "hbs")
+
+    with pytest.raises(ValueError):
+        semantics_values(tree, "unknown")